@@ -0,0 +1 @@
+"""Benchmarks for the tracker's hot paths; run with `python -m benchmarks.<name>`."""
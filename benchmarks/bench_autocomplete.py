@@ -0,0 +1,44 @@
+"""Destination autocomplete: build time and top-k latency over a large trip history.
+
+    python -m benchmarks.bench_autocomplete [trips]
+"""
+import sys
+import time
+from collections import Counter
+from datetime import date
+
+from ecoride.autocomplete import DestinationIndex
+from benchmarks.synthetic import synthetic_trips
+
+PREFIXES = ('', 'P', 'Place', 'Place 1', 'Place 12', 'Place 123', 'Nowhere')
+
+
+def run(n=1_000_000):
+    trips = synthetic_trips(n)
+    # The shape TripStore.destination_history() returns: one row per (destination, day)
+    history = [(destination, trip_date, count)
+               for (destination, trip_date), count in Counter(zip(trips['destination'], trips['trip_date'])).items()]
+
+    start = time.perf_counter()
+    index = DestinationIndex.from_history(history)
+    build = time.perf_counter() - start
+    print(f"{n:,} trips, {len(history):,} (destination, day) rows, {len(index):,} destinations")
+    print(f"  build                  {build * 1000:10.1f} ms")
+
+    for prefix in PREFIXES:
+        repeat = 10_000
+        start = time.perf_counter()
+        for _ in range(repeat):
+            suggestions = index.complete(prefix)
+        per_call = (time.perf_counter() - start) / repeat
+        print(f"  complete({prefix!r:<12})  {per_call * 1e6:10.2f} µs  -> {suggestions[:3]}")
+
+    repeat = 10_000
+    start = time.perf_counter()
+    for i in range(repeat):
+        index.add(f"Place {i % 500}", date(2025, 1, 1))
+    print(f"  add (save a trip)      {(time.perf_counter() - start) / repeat * 1e6:10.2f} µs")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
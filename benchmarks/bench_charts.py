@@ -0,0 +1,86 @@
+"""Figure build plus JSON serialization time for the trend chart over long histories.
+
+    python -m benchmarks.bench_charts [trips ...]
+
+'px per trip' charts every trip with plotly.express, 'px per day' charts the
+per-day rollup rows the same way, and the ecoride.charts rows chart the
+rollup series at 'auto' granularity (bars), at day granularity (WebGL,
+min/max-decimated) and from a warm FigureCache. Serialization uses
+plotly.io.to_json, as st.plotly_chart does.
+"""
+import sys
+import time
+
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+
+from ecoride.charts import FigureCache, auto_granularity, data_key, series_arrays, trend_figure
+from ecoride.emissions import calculate_batch, encode_modes
+from ecoride.rollups import RollupIndex
+from benchmarks.synthetic import synthetic_trips
+
+
+def _rollups(trips):
+    df = pd.DataFrame({
+        'trip_date': trips['trip_date'],
+        'mode_code': encode_modes(trips['transport_type']),
+        'distance': trips['distance'],
+    })
+    df['cost'], df['emission'] = calculate_batch(df['distance'], df['mode_code'])
+    daily = df.groupby(['trip_date', 'mode_code'], sort=False).agg(
+        distance=('distance', 'sum'), cost=('cost', 'sum'), emission=('emission', 'sum'), trips=('distance', 'size'),
+    ).reset_index()
+    return RollupIndex.from_daily_totals(daily.itertuples(index=False, name=None))
+
+
+def _timed(build, repeat):
+    """Best build + serialize time in seconds and the payload size in bytes"""
+    best, size = float('inf'), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = pio.to_json(build(), validate=False)
+        best = min(best, time.perf_counter() - start)
+        size = len(payload)
+    return best, size
+
+
+def _trend(rollups, granularity):
+    periods, values = series_arrays(rollups.series(rollups.first_day, rollups.last_day, granularity))
+    return trend_figure(periods, values, granularity)
+
+
+def run(sizes=(10_000, 100_000, 1_000_000), repeat=3):
+    for n in sizes:
+        trips = synthetic_trips(n)
+        start = time.perf_counter()
+        rollups = _rollups(trips)
+        rollup_seconds = time.perf_counter() - start
+        first, last = rollups.first_day, rollups.last_day
+        granularity = auto_granularity(first, last)
+
+        cache = FigureCache()
+
+        def cached():
+            periods, values = series_arrays(rollups.series(first, last, granularity))
+            key = data_key('trend', periods.astype('int64'), values, granularity)
+            return cache.get_or_build(key, lambda: trend_figure(periods, values, granularity))
+
+        cached()
+        per_trip = pd.DataFrame({'Period': trips['trip_date'], 'Distance': trips['distance'],
+                                 'Transport': trips['transport_type']})
+        timings = {
+            'px per trip': _timed(lambda: px.bar(per_trip, x='Period', y='Distance', color='Transport'), 1),
+            'px per day': _timed(lambda: px.bar(pd.DataFrame(rollups.series_records(first, last, 'day')),
+                                                x='Period', y='Distance', color='Transport'), repeat),
+            f'charts auto ({granularity})': _timed(lambda: _trend(rollups, granularity), repeat),
+            'charts day (WebGL)': _timed(lambda: _trend(rollups, 'day'), repeat),
+            'charts cached': _timed(cached, repeat),
+        }
+        print(f"{n:>10,} trips  ({len(rollups):,} days, rollups built in {rollup_seconds * 1000:.0f} ms)")
+        for name, (seconds, size) in timings.items():
+            print(f"  {name:<24} {seconds * 1000:>9.1f} ms  {size / 1024:>9,.0f} KiB")
+
+
+if __name__ == '__main__':
+    run(tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000, 1_000_000))
@@ -0,0 +1,75 @@
+"""Rows/sec of the batch engine against the original per-call loop.
+
+    python -m benchmarks.bench_emissions [rows ...]
+"""
+import sys
+import time
+
+import pandas as pd
+
+from ecoride.emissions import calculate_batch, calculate_frame
+from benchmarks.synthetic import synthetic_trips
+
+
+def legacy_calculate_emissions_and_cost(distance, transport_type):
+    """The pre-batch implementation, kept verbatim as the baseline"""
+    emission_factors = {
+        "🏍️ Motorcycle/Scooter": 80,
+        "🚗 Car (Petrol)": 120,
+        "🚗 Car (Diesel)": 100,
+        "🚌 Bus": 40,
+        "🚆 Train": 30,
+        "🚕 Auto Rickshaw": 90,
+        "🚲 Bicycle": 0,
+        "🚶 Walking": 0,
+        "✈️ Flight (Domestic)": 200,
+        "🛵 Electric Scooter": 20
+    }
+    cost_factors = {
+        "🏍️ Motorcycle/Scooter": 3.5,
+        "🚗 Car (Petrol)": 6.0,
+        "🚗 Car (Diesel)": 4.5,
+        "🚌 Bus": 2.0,
+        "🚆 Train": 1.5,
+        "🚕 Auto Rickshaw": 12.0,
+        "🚲 Bicycle": 0,
+        "🚶 Walking": 0,
+        "✈️ Flight (Domestic)": 8.0,
+        "🛵 Electric Scooter": 0.5
+    }
+    emission = distance * emission_factors.get(transport_type, 75)
+    cost = distance * cost_factors.get(transport_type, 3.5)
+    return cost, emission
+
+
+def _best_of(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes=(10_000, 100_000, 1_000_000)):
+    for n in sizes:
+        trips = synthetic_trips(n)
+        distances = trips['distance']
+        modes = trips['transport_type']
+        df = pd.DataFrame({'actual_distance': distances, 'transport_type': modes})
+        categorical = df['transport_type'].astype('category')
+
+        timings = {
+            'per-call loop': _best_of(lambda: [legacy_calculate_emissions_and_cost(d, m) for d, m in zip(distances, modes)]),
+            'batch (labels)': _best_of(lambda: calculate_batch(distances, modes)),
+            'batch (categorical)': _best_of(lambda: calculate_batch(distances, categorical)),
+            'batch (DataFrame)': _best_of(lambda: calculate_frame(df)),
+        }
+        baseline = timings['per-call loop']
+        print(f"{n:>10,} trips")
+        for name, seconds in timings.items():
+            print(f"  {name:<20} {n / seconds:>14,.0f} rows/s  ({baseline / seconds:5.1f}x)")
+
+
+if __name__ == '__main__':
+    run(tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000, 1_000_000))
@@ -0,0 +1,76 @@
+"""Peak memory and time of full-history exports against json.dumps of the whole history.
+
+    python -m benchmarks.bench_exports [trips ...]
+
+Python allocations are measured with tracemalloc and Arrow buffers with the
+pyarrow memory pool, in a second run so tracing does not skew the timings.
+Output goes to a temporary file, as in the app.
+"""
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from ecoride.exports import export_trips
+from ecoride.importer import prepare_chunk
+from ecoride.store import TripStore
+from benchmarks.synthetic import synthetic_trips
+
+
+def _fill(store, n, chunksize=100_000):
+    trips = pd.DataFrame(synthetic_trips(n))
+    for start in range(0, n, chunksize):
+        prepared, _ = prepare_chunk(trips.iloc[start:start + chunksize])
+        store.append_frame('bench', prepared)
+
+
+def _legacy(store, out):
+    """Whole history materialized and dumped in one go, as the weekly JSON report does"""
+    trips = store.trips_between('bench', '0000-01-01', '9999-12-31')
+    out.write(json.dumps({'user_info': {'name': 'bench'}, 'trips': trips}, indent=2).encode('utf-8'))
+
+
+def _measure(write):
+    """(seconds untraced, peak bytes traced, output bytes); tracing slows Python code, so time a separate run"""
+    with tempfile.TemporaryFile() as out:
+        start = time.perf_counter()
+        write(out)
+        seconds = time.perf_counter() - start
+        size = out.tell()
+
+    gc.collect()
+    pool = pa.default_memory_pool()
+    arrow_before = pool.max_memory()
+    tracemalloc.start()
+    with tempfile.TemporaryFile() as out:
+        write(out)
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, python_peak + max(pool.max_memory() - arrow_before, 0), size
+
+
+def run(sizes=(100_000, 1_000_000)):
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            store = TripStore(str(Path(directory) / 'bench.db'))
+            _fill(store, n)
+            cases = {'json.dumps (legacy)': lambda out: _legacy(store, out)}
+            for fmt, compression in (('ndjson', 'none'), ('ndjson', 'gzip'), ('ndjson', 'zstd'),
+                                     ('parquet', 'zstd'), ('arrow', 'zstd')):
+                cases[f'{fmt} {compression}'] = (
+                    lambda out, fmt=fmt, compression=compression: export_trips(store, 'bench', out, fmt, compression))
+            print(f"{n:>10,} trips")
+            for name, write in cases.items():
+                seconds, peak, size = _measure(write)
+                print(f"  {name:<22} {seconds:>7.2f} s  peak {peak / 2**20:>8.1f} MiB  output {size / 2**20:>8.1f} MiB")
+            store.close()
+
+
+if __name__ == '__main__':
+    run(tuple(int(arg) for arg in sys.argv[1:]) or (100_000, 1_000_000))
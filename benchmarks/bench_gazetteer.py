@@ -0,0 +1,51 @@
+"""Gazetteer: build time and per-call latency of name lookups and nearest-place search.
+
+    python -m benchmarks.bench_gazetteer [places ...]
+
+Nearest-place search through the KD-tree is compared with a brute-force
+haversine scan over every place, the cost without a spatial index.
+"""
+import sys
+import time
+
+import numpy as np
+
+from ecoride.gazetteer import Gazetteer, haversine_km
+
+
+def _synthetic(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lats = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    lons = rng.uniform(-180, 180, n)
+    return [f"Place {i}" for i in range(n)], lats, lons
+
+
+def _per_call(fn, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    return (time.perf_counter() - start) / repeat
+
+
+def run(sizes=(10_000, 100_000, 500_000)):
+    for n in sizes:
+        names, lats, lons = _synthetic(n)
+        start = time.perf_counter()
+        gazetteer = Gazetteer(names, lats, lons)
+        build = time.perf_counter() - start
+        print(f"{n:>10,} places  build {build * 1000:8.1f} ms")
+
+        pairs = [(names[i], names[-1 - i]) for i in range(1000)]
+        timings = {
+            'lookup': _per_call(lambda i: gazetteer.lookup(names[i % n]), 10_000),
+            'distance_km': _per_call(lambda i: gazetteer.distance_km(*pairs[i % 1000]), 10_000),
+            'near (k=5)': _per_call(lambda i: gazetteer.near(names[i % n]), 2_000),
+            'brute-force nearest': _per_call(
+                lambda i: np.argpartition(haversine_km(lats[i], lons[i], lats, lons), 5)[:5], 20),
+        }
+        for name, seconds in timings.items():
+            print(f"  {name:<22} {seconds * 1e6:10.2f} µs")
+
+
+if __name__ == '__main__':
+    run(tuple(int(arg) for arg in sys.argv[1:]) or (10_000, 100_000, 500_000))
@@ -0,0 +1,59 @@
+"""Bytes per trip: weekly_data-style dicts against the array-backed TripTable.
+
+    python -m benchmarks.bench_memory [trips ...]
+"""
+import sys
+import tracemalloc
+
+from ecoride.emissions import calculate_batch
+from ecoride.trips import TripTable
+from benchmarks.synthetic import synthetic_trips
+
+
+def _columns(n):
+    trips = synthetic_trips(n)
+    multiplier = [2 if trip_type == 'Round-trip' else 1 for trip_type in trips['trip_type']]
+    trips['actual_distance'] = trips['distance'] * multiplier
+    trips['cost'], trips['emission'] = calculate_batch(trips['actual_distance'], trips['transport_type'])
+    return trips
+
+
+def _dicts(trips):
+    """Per-trip dicts shaped like the session's weekly_data entries, with their own objects"""
+    return [
+        {
+            'traveled': True,
+            'trip_date': trips['trip_date'][i],
+            'destination': str(trips['destination'][i]),
+            'transport_type': str(trips['transport_type'][i]),
+            'distance': float(trips['distance'][i]),
+            'actual_distance': float(trips['actual_distance'][i]),
+            'trip_type': str(trips['trip_type'][i]),
+            'cost': float(trips['cost'][i]),
+            'emission': float(trips['emission'][i]),
+        }
+        for i in range(len(trips['trip_date']))
+    ]
+
+
+def _allocated(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, allocated
+
+
+def run(sizes=(1_000, 100_000)):
+    for n in sizes:
+        trips = _columns(n)
+        records, dict_bytes = _allocated(lambda: _dicts(trips))
+        _, table_bytes = _allocated(lambda: TripTable.from_records(records))
+        print(f"{n:>10,} trips")
+        print(f"  {'dict per trip':<16} {dict_bytes / n:8.1f} bytes/trip")
+        print(f"  {'TripTable':<16} {table_bytes / n:8.1f} bytes/trip  ({dict_bytes / table_bytes:4.1f}x smaller)")
+
+
+if __name__ == '__main__':
+    run(tuple(int(arg) for arg in sys.argv[1:]) or (1_000, 100_000))
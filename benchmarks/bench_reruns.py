@@ -0,0 +1,90 @@
+"""Per-interaction latency of the app under Streamlit's AppTest harness.
+
+    python -m benchmarks.bench_reruns [--script PATH] [--repeat N]
+
+Fills a full week of trips, then times the interactions a user repeats most.
+Pass --script to time another revision of the app (e.g. a checkout of an
+older commit) for before/after comparisons. AppTest always executes the
+whole script, so the numbers measure per-run work (chart/table rebuilds)
+rather than the browser-side savings of fragment-scoped reruns.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+APP = Path(__file__).resolve().parent.parent / 'travel_tracker_streamlit_ui.py'
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def _widget(elements, key):
+    return next(element for element in elements if element.key == key)
+
+
+def _timed(at):
+    start = time.perf_counter()
+    at.run()
+    assert not at.exception, at.exception
+    return time.perf_counter() - start
+
+
+def _fill_day(at, day, destination, distance):
+    _widget(at.radio, f'travel_{day}').set_value('Yes')
+    at.run()
+    _widget(at.text_input, f'dest_{day}').input(destination)
+    _widget(at.number_input, f'dist_{day}').set_value(distance)
+    _widget(at.button, f'save_{day}').click()
+    at.run()
+
+
+def measure(script):
+    """Return {interaction: seconds} for one pass over a fresh app session"""
+    timings = {}
+    at = AppTest.from_file(str(script), default_timeout=60)
+    timings['first paint'] = _timed(at)
+
+    at.sidebar.text_input[0].input('Bench User')
+    at.sidebar.selectbox[0].select('Honda City')
+    at.sidebar.text_input[1].input('Pune')
+    at.sidebar.button[0].click()
+    timings['save profile'] = _timed(at)
+
+    for i, day in enumerate(DAYS[:-1]):
+        _fill_day(at, day, f'Stop {i}', 5.0 + i)
+
+    _widget(at.radio, 'travel_Sunday').set_value('Yes')
+    timings['flip travel radio'] = _timed(at)
+    _widget(at.text_input, 'dest_Sunday').input('Beach')
+    timings['type destination'] = _timed(at)
+    _widget(at.number_input, 'dist_Sunday').set_value(30.0)
+    timings['change distance'] = _timed(at)
+    _widget(at.button, 'save_Sunday').click()
+    timings['save day'] = _timed(at)
+    timings['idle rerun'] = _timed(at)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--script', default=APP)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    samples = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for run in range(args.repeat):
+            os.environ['ECORIDE_DB'] = os.path.join(tmp, f'bench_{run}.db')
+            for name, seconds in measure(args.script).items():
+                samples.setdefault(name, []).append(seconds)
+
+    print(f"{args.script} (median of {args.repeat})")
+    for name, values in samples.items():
+        print(f"  {name:<20} {statistics.median(values) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Cold import time and first paint of the setup screen, each in a fresh interpreter.
+
+    python -m benchmarks.bench_startup [--script PATH] [--repeat N]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / 'travel_tracker_streamlit_ui.py'
+HEAVY_MODULES = ('numpy', 'pandas', 'plotly.express')
+
+IMPORTS = {
+    'ecoride (factors only)': 'import ecoride',
+    'ecoride.emissions': 'import ecoride.emissions',
+    'pandas + plotly.express': 'import pandas, plotly.express',
+}
+
+IMPORT_PROBE = """
+import time
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+FIRST_PAINT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({script!r}, default_timeout=60).run()
+assert not at.exception, at.exception
+print(json.dumps({{
+    'seconds': time.perf_counter() - start,
+    'loaded': [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def _probe(code):
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return output.strip().splitlines()[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--script', default=str(APP))
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"cold import (median of {args.repeat})")
+    for name, statement in IMPORTS.items():
+        samples = [float(_probe(IMPORT_PROBE.format(statement=statement))) for _ in range(args.repeat)]
+        print(f"  {name:<26} {statistics.median(samples) * 1000:8.1f} ms")
+
+    results = [json.loads(_probe(FIRST_PAINT_PROBE.format(script=args.script, heavy=HEAVY_MODULES)))
+               for _ in range(args.repeat)]
+    print(f"first paint of {args.script} (median of {args.repeat})")
+    print(f"  setup screen               {statistics.median(r['seconds'] for r in results) * 1000:8.1f} ms")
+    print(f"  heavy modules loaded       {', '.join(results[0]['loaded']) or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""Benchmark suite with saved baselines; exits non-zero when a tracked metric regresses.
+
+    python -m benchmarks.regression [--sizes N ...] [--apptest-sizes N ...] [--repeat N]
+                                    [--threshold 0.5] [--baseline PATH] [--save] [--only PREFIX ...]
+
+Every metric is the best of --repeat runs on synthetic histories, so one
+noisy run does not count as a regression. A metric regresses when it is
+more than --threshold slower than its baseline and by more than
+--min-delta seconds. --save records the current results as the new
+baseline. Baselines are machine-specific: record them on the machine
+that runs the check.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pandas as pd
+import plotly.io as pio
+
+from ecoride.aggregates import RunningAggregate
+from ecoride.charts import auto_granularity, daily_figure, mode_share_figure, series_arrays, trend_figure
+from ecoride.emissions import calculate_batch, calculate_emissions_and_cost
+from ecoride.importer import prepare_chunk
+from ecoride.reports import build_report
+from ecoride.rollups import RollupIndex
+from ecoride.store import DAYS_OF_WEEK, TRIP_FIELDS, TripStore, group_by_weekday, week_start
+from ecoride.summary import style_transport_table, transport_table
+from benchmarks.synthetic import synthetic_trips
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / 'travel_tracker_streamlit_ui.py'
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_APPTEST_SIZES = (1_000, 10_000)
+SINGLE_CALLS = 1_000
+USER = 'Bench User'
+
+
+def _best_of(fn, repeat, min_seconds=0.2, max_runs=200):
+    """Fastest of at least repeat runs, running fast functions until min_seconds have been spent"""
+    # Like timeit, keep the collector out of the timed region to cut run-to-run noise
+    best, spent, runs = float('inf'), 0.0, 0
+    gc.collect()
+    gc.disable()
+    try:
+        while runs < repeat or (spent < min_seconds and runs < max_runs):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            best, spent, runs = min(best, elapsed), spent + elapsed, runs + 1
+    finally:
+        gc.enable()
+    return best
+
+
+def _history(n):
+    """n priced synthetic trips ending today, so the current week has some of them"""
+    trips = pd.DataFrame(synthetic_trips(n, start=date.today() - timedelta(days=5 * 365 - 1)))
+    priced, _ = prepare_chunk(trips)
+    return priced
+
+
+def _records(priced):
+    return priced[['trip_date', *TRIP_FIELDS]].to_dict('records')
+
+
+def engine_metrics(sizes, repeat):
+    """calculate_emissions_and_cost per call and calculate_batch per history"""
+    metrics = {
+        f'emissions.single_call[x{SINGLE_CALLS}]': _best_of(
+            lambda: [calculate_emissions_and_cost(12.5, "🚌 Bus") for _ in range(SINGLE_CALLS)], repeat),
+    }
+    for n in sizes:
+        trips = synthetic_trips(n)
+        metrics[f'emissions.batch[{n}]'] = _best_of(
+            lambda: calculate_batch(trips['distance'], trips['transport_type'], trips['trip_date']), repeat)
+    return metrics
+
+
+def summary_metrics(sizes, repeat):
+    """Weekly aggregation, transport_df build + styling, chart construction and the JSON report.
+
+    The weekly metrics run on the current week of each history, as the app
+    does; the trend chart covers the whole history.
+    """
+    metrics = {}
+    for n in sizes:
+        records = _records(_history(n))
+        monday = week_start().isoformat()
+        week = [record for record in records if record['trip_date'] >= monday]
+        aggregate = RunningAggregate.from_records(week)
+        weekly_data = group_by_weekday(week)
+        rollups = RollupIndex.from_records(records)
+        first, last = rollups.first_day, rollups.last_day
+
+        def aggregation():
+            built = RunningAggregate.from_records(week)
+            built.totals()
+            built.daily_rows(DAYS_OF_WEEK)
+
+        def table():
+            style_transport_table(transport_table(aggregate)).to_html()
+
+        def summary_charts():
+            transport_df = transport_table(aggregate)
+            pio.to_json(daily_figure(aggregate.daily_rows(DAYS_OF_WEEK)), validate=False)
+            pio.to_json(mode_share_figure(transport_df['Transport Mode'], transport_df['distance']), validate=False)
+
+        def trend_chart():
+            granularity = auto_granularity(first, last)
+            periods, values = series_arrays(rollups.series(first, last, granularity))
+            pio.to_json(trend_figure(periods, values, granularity), validate=False)
+
+        def report():
+            json.dumps(build_report({'name': USER}, weekly_data, aggregate), indent=2)
+
+        metrics[f'aggregation.weekly[{n}]'] = _best_of(aggregation, repeat)
+        metrics[f'table.transport_df[{n}]'] = _best_of(table, repeat)
+        metrics[f'charts.summary[{n}]'] = _best_of(summary_charts, repeat)
+        metrics[f'charts.trend[{n}]'] = _best_of(trend_chart, repeat)
+        metrics[f'report.json[{n}]'] = _best_of(report, repeat)
+    return metrics
+
+
+def apptest_metrics(sizes, repeat, script=APP):
+    """Full-script runs under AppTest with a stored history: loading it, then an idle rerun"""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    metrics = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for n in sizes:
+            os.environ['ECORIDE_DB'] = os.path.join(directory, f'bench_{n}.db')
+            store = TripStore(os.environ['ECORIDE_DB'])
+            store.save_profile(USER, 30, 'Honda City', 'Pune')
+            store.append_frame(USER, _history(n))
+            store.close()
+            # The app opens its store once per process; start each size from a clean cache
+            st.cache_resource.clear()
+
+            # One untimed pass compiles the script and warms the app's process-wide caches
+            load, rerun = float('inf'), float('inf')
+            for attempt in range(repeat + 1):
+                at = AppTest.from_file(str(script), default_timeout=300).run()
+                at.sidebar.text_input[0].input(USER)
+                at.sidebar.selectbox[0].select('Honda City')
+                at.sidebar.text_input[1].input('Pune')
+                at.sidebar.button[0].click()
+                start = time.perf_counter()
+                at.run()
+                loaded = time.perf_counter() - start
+                start = time.perf_counter()
+                at.run()
+                reran = time.perf_counter() - start
+                if at.exception:
+                    raise RuntimeError(f"App raised during the benchmark: {at.exception}")
+                if attempt:
+                    load, rerun = min(load, loaded), min(rerun, reran)
+            metrics[f'apptest.load_history[{n}]'] = load
+            metrics[f'apptest.rerun[{n}]'] = rerun
+            st.cache_resource.clear()
+    return metrics
+
+
+def compare(current, baseline, threshold, min_delta):
+    """[(metric, baseline seconds or None, current seconds, status)] with status 'ok', 'new' or 'REGRESSED'"""
+    rows = []
+    for name, seconds in current.items():
+        before = baseline.get(name)
+        if before is None:
+            status = 'new'
+        elif seconds > before * (1 + threshold) and seconds - before > min_delta:
+            status = 'REGRESSED'
+        else:
+            status = 'ok'
+        rows.append((name, before, seconds, status))
+    return rows
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f).get('metrics', {})
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, metrics):
+    baseline = {
+        'recorded': date.today().isoformat(),
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                    'processor': platform.processor() or platform.machine()},
+        'metrics': {**load_baseline(path), **metrics},
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--apptest-sizes', type=int, nargs='*', default=DEFAULT_APPTEST_SIZES,
+                        help="history sizes for the AppTest reruns (none to skip them)")
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help="allowed slowdown as a fraction (default: 0.5; tighten on quiet, dedicated hardware)")
+    parser.add_argument('--min-delta', type=float, default=0.005,
+                        help="ignore slowdowns smaller than this many seconds (default: 0.005)")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save', action='store_true', help="record the results as the new baseline")
+    parser.add_argument('--only', nargs='+', default=None, help="run only metrics starting with these prefixes")
+    args = parser.parse_args(argv)
+
+    suites = (
+        (('emissions',), lambda: engine_metrics(args.sizes, args.repeat)),
+        (('aggregation', 'table', 'charts', 'report'), lambda: summary_metrics(args.sizes, args.repeat)),
+        (('apptest',), lambda: apptest_metrics(args.apptest_sizes, args.repeat)),
+    )
+    current = {}
+    for groups, run in suites:
+        if not args.only or any(only.split('.', 1)[0] in groups for only in args.only):
+            current.update(run())
+    if args.only:
+        current = {name: seconds for name, seconds in current.items() if name.startswith(tuple(args.only))}
+
+    rows = compare(current, load_baseline(args.baseline), args.threshold, args.min_delta)
+    for name, before, seconds, status in rows:
+        change = f"{(seconds / before - 1) * 100:+7.1f}%" if before else '       '
+        baseline_ms = f"{before * 1000:10.2f}" if before is not None else ' ' * 10
+        print(f"  {name:<34} {baseline_ms} ms -> {seconds * 1000:10.2f} ms  {change}  {status}")
+
+    if args.save:
+        save_baseline(args.baseline, current)
+        print(f"Saved {len(current)} metric(s) to {args.baseline}", file=sys.stderr)
+        return 0
+
+    regressed = [row[0] for row in rows if row[3] == 'REGRESSED']
+    if regressed:
+        print(f"{len(regressed)} metric(s) regressed by more than {args.threshold:.0%}: {', '.join(regressed)}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
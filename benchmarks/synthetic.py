@@ -0,0 +1,20 @@
+"""Synthetic trip histories shared by the benchmarks."""
+from datetime import date, timedelta
+
+import numpy as np
+
+from ecoride.factors import TRANSPORT_MODES
+
+
+def synthetic_trips(n, seed=0, start=date(2020, 1, 1)):
+    """Return column arrays for n random trips spread over several years"""
+    rng = np.random.default_rng(seed)
+    modes = np.array(TRANSPORT_MODES, dtype=object)
+    day_offsets = np.sort(rng.integers(0, 5 * 365, size=n))
+    return {
+        'trip_date': [start + timedelta(days=int(offset)) for offset in day_offsets],
+        'transport_type': modes[rng.integers(0, len(modes), size=n)],
+        'distance': rng.gamma(2.0, 6.0, size=n).round(1),
+        'trip_type': np.where(rng.random(n) < 0.4, 'Round-trip', 'One-way'),
+        'destination': np.array([f"Place {i}" for i in range(500)], dtype=object)[rng.zipf(1.3, size=n) % 500],
+    }
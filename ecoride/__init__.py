@@ -0,0 +1,16 @@
+"""Compute core for the EcoRide Travel Tracker.
+
+Importing the package only loads the transport mode list. The NumPy/pandas
+engine in ecoride.emissions loads on first use of one of its functions,
+so callers that never price a trip skip those imports.
+"""
+from .factors import TRANSPORT_MODES
+
+_ENGINE_EXPORTS = ('calculate_batch', 'calculate_frame', 'calculate_emissions_and_cost', 'encode_modes')
+
+
+def __getattr__(name):
+    if name in _ENGINE_EXPORTS:
+        from . import emissions
+        return getattr(emissions, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
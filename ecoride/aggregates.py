@@ -0,0 +1,136 @@
+"""Running weekly aggregates maintained incrementally as days are saved or deleted."""
+import itertools
+from datetime import date
+
+from .store import DAYS_OF_WEEK
+
+DEFAULT_TRANSPORT = '🏍️ Motorcycle/Scooter'
+
+# Versions are unique per process so a rebuilt aggregate never reuses a stale cache key
+_versions = itertools.count(1)
+
+
+def _contribution(record):
+    """Extract (transport, distance, cost, emission) from a trip dict"""
+    return (
+        record.get('transport_type', DEFAULT_TRANSPORT),
+        record.get('actual_distance', record.get('distance', 0)),
+        record.get('cost', 0),
+        record.get('emission', 0),
+    )
+
+
+def day_trips(record):
+    """The individual trips behind a weekly_data day entry (several when 'trips' is present)"""
+    return record.get('trips', [record])
+
+
+class RunningAggregate:
+    """Totals and per-mode sums for one week of trips.
+
+    save(), add(), replace() and delete() adjust the sums by the difference
+    a single edit makes, so the summary section reads precomputed numbers
+    instead of rescanning the week. version changes on every edit and can key caches.
+    """
+
+    def __init__(self):
+        self.days = {}
+        self.transport_usage = {}
+        self.total_distance = 0.0
+        self.total_cost = 0.0
+        self.total_emission = 0.0
+        self.version = next(_versions)
+
+    @classmethod
+    def from_weekly_data(cls, weekly_data):
+        """Build an aggregate from an existing weekly_data dict"""
+        aggregate = cls()
+        for day, record in weekly_data.items():
+            if record.get('traveled', False):
+                for trip in day_trips(record):
+                    aggregate.add(day, trip)
+        return aggregate
+
+    @classmethod
+    def from_records(cls, records):
+        """Build an aggregate from trip dicts carrying an ISO 'trip_date'"""
+        aggregate = cls()
+        for record in records:
+            aggregate.add(DAYS_OF_WEEK[date.fromisoformat(record['trip_date']).weekday()], record)
+        return aggregate
+
+    @property
+    def travel_days(self):
+        return len(self.days)
+
+    def save(self, day, record):
+        """Make record the only trip for a day (a record with traveled=False clears the day)"""
+        self._remove(day)
+        if record.get('traveled', False):
+            self._add(day, record)
+        self.version = next(_versions)
+
+    def add(self, day, record):
+        """Record one more trip on a day"""
+        self._add(day, record)
+        self.version = next(_versions)
+
+    def replace(self, day, index, record):
+        """Swap the index-th trip recorded on a day (oldest first) for record"""
+        contributions = self.days[day]
+        self._apply(contributions[index], -1)
+        contributions[index] = _contribution(record)
+        self._apply(contributions[index], 1)
+        self.version = next(_versions)
+
+    def delete(self, day):
+        """Forget every trip saved for a day, if any"""
+        if self._remove(day):
+            self.version = next(_versions)
+
+    def totals(self):
+        return {
+            'total_distance': self.total_distance,
+            'total_cost': self.total_cost,
+            'total_emission': self.total_emission,
+            'travel_days': self.travel_days,
+        }
+
+    def daily_rows(self, day_order):
+        """Per-trip chart rows in day_order, skipping days without travel"""
+        rows = []
+        for day in day_order:
+            for transport, distance, cost, emission in self.days.get(day, ()):
+                rows.append({'Day': day, 'Distance': distance, 'Cost': cost, 'Emission': emission, 'Transport': transport})
+        return rows
+
+    def _add(self, day, record):
+        contribution = _contribution(record)
+        self.days.setdefault(day, []).append(contribution)
+        self._apply(contribution, 1)
+
+    def _remove(self, day):
+        contributions = self.days.pop(day, None)
+        if contributions is None:
+            return False
+        for contribution in contributions:
+            self._apply(contribution, -1)
+        return True
+
+    def _apply(self, contribution, sign):
+        transport, distance, cost, emission = contribution
+        usage = self.transport_usage.setdefault(transport, {'distance': 0, 'cost': 0, 'emission': 0, 'trips': 0})
+        usage['distance'] += sign * distance
+        usage['cost'] += sign * cost
+        usage['emission'] += sign * emission
+        usage['trips'] += sign
+        if usage['trips'] == 0:
+            # Drop empty modes so subtraction round-off never lingers in the table
+            del self.transport_usage[transport]
+
+        if self.days:
+            self.total_distance += sign * distance
+            self.total_cost += sign * cost
+            self.total_emission += sign * emission
+        else:
+            self.total_distance = self.total_cost = self.total_emission = 0.0
@@ -0,0 +1,137 @@
+"""Per-user destination autocomplete ranked by frequency and recency."""
+from datetime import date
+
+DEFAULT_TOP_K = 10
+DEFAULT_HALF_LIFE_DAYS = 90
+# Weights are 2 ** (days since _EPOCH / half-life); a shared epoch keeps them comparable at any query time
+_EPOCH = date(2000, 1, 1).toordinal()
+# Largest exponent used: 2 ** 900 leaves room below the float maximum for sums over any realistic trip count.
+# Later dates (beyond ~2220 with the default half-life) all weigh the same instead of overflowing
+_MAX_EXPONENT = 900.0
+
+
+def _key(destination):
+    return ' '.join(str(destination).split()).casefold()
+
+
+class _Node:
+    __slots__ = ('children', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.top = []
+
+
+class DestinationIndex:
+    """Trie over past destinations where every node caches its top-k completions.
+
+    Each trip adds a recency-decayed weight to its destination, so a place
+    visited often or lately ranks first. complete() walks at most
+    len(prefix) nodes and returns the cached list, so lookups cost the same
+    for ten trips or ten million. Adding a trip touches one path of the
+    trie; removing one rebuilds the caches along that path only.
+    """
+
+    def __init__(self, k=DEFAULT_TOP_K, half_life_days=DEFAULT_HALF_LIFE_DAYS):
+        self.k = k
+        self.half_life_days = half_life_days
+        self.weights = {}
+        self.counts = {}
+        self.display = {}
+        self._root = _Node()
+
+    def __len__(self):
+        return len(self.weights)
+
+    @classmethod
+    def from_history(cls, rows, k=DEFAULT_TOP_K, half_life_days=DEFAULT_HALF_LIFE_DAYS):
+        """Build from (destination, trip_date, trips) rows such as TripStore.destination_history()"""
+        index = cls(k, half_life_days)
+        for destination, trip_date, trips in rows:
+            key = _key(destination)
+            if key:
+                index.weights[key] = index.weights.get(key, 0.0) + trips * index._weight(trip_date)
+                index.counts[key] = index.counts.get(key, 0) + trips
+                index.display[key] = destination
+        for key in index.weights:
+            node = index._root
+            for char in key:
+                node = node.children.setdefault(char, _Node())
+        index._rebuild(index._root, '')
+        return index
+
+    def add(self, destination, trip_date, trips=1):
+        """Count trips to destination on trip_date (negative trips remove them)"""
+        key = _key(destination)
+        if not key:
+            return
+        weight = self.weights.get(key, 0.0) + trips * self._weight(trip_date)
+        count = self.counts.get(key, 0) + trips
+        path = [self._root]
+        for char in key:
+            path.append(path[-1].children.setdefault(char, _Node()))
+
+        if trips > 0:
+            self.weights[key] = weight
+            self.counts[key] = count
+            self.display[key] = destination
+            # Weights only grew, so each cached list just needs this key placed correctly
+            for node in path:
+                self._promote(node, key)
+        else:
+            # The trip count decides whether the key survives: an old trip's weight can be
+            # many orders of magnitude below a recent one's, so no float threshold works
+            if count <= 0:
+                self.weights.pop(key, None)
+                self.counts.pop(key, None)
+                self.display.pop(key, None)
+            else:
+                # Subtracting a much larger weight can leave round-off below zero
+                self.weights[key] = max(weight, 0.0)
+                self.counts[key] = count
+            for depth in range(len(path) - 1, -1, -1):
+                self._refresh(path[depth], key[:depth])
+
+    def remove(self, destination, trip_date, trips=1):
+        self.add(destination, trip_date, -trips)
+
+    def complete(self, prefix, k=5):
+        """Up to k past destinations starting with prefix, best first"""
+        node = self._root
+        for char in _key(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [self.display[key] for key in node.top[:k]]
+
+    def _weight(self, trip_date):
+        if not isinstance(trip_date, date):
+            trip_date = date.fromisoformat(str(trip_date))
+        return 2.0 ** min((trip_date.toordinal() - _EPOCH) / self.half_life_days, _MAX_EXPONENT)
+
+    def _promote(self, node, key):
+        top = node.top
+        if key in top:
+            top.remove(key)
+        elif len(top) >= self.k and self.weights[key] <= self.weights[top[-1]]:
+            return
+        # Insertion into a list of at most k entries
+        i = 0
+        while i < len(top) and self.weights[top[i]] >= self.weights[key]:
+            i += 1
+        top.insert(i, key)
+        del top[self.k:]
+
+    def _refresh(self, node, prefix):
+        """Recompute a node's cache from its own key (if any) and its children's caches"""
+        candidates = set()
+        if prefix in self.weights:
+            candidates.add(prefix)
+        for child in node.children.values():
+            candidates.update(child.top)
+        node.top = sorted(candidates, key=self.weights.__getitem__, reverse=True)[:self.k]
+
+    def _rebuild(self, node, prefix):
+        for char, child in node.children.items():
+            self._rebuild(child, prefix + char)
+        self._refresh(node, prefix)
@@ -0,0 +1,115 @@
+"""Background analytics jobs keyed by a snapshot version of the trip data.
+
+Each session submits its heavy analytics (tables, figures, scenario
+re-pricing) to one process-wide thread pool instead of computing them while
+the page renders. A job is identified by a key (session and section) and
+the version of the data it was built from; submitting a newer version for
+the same key cancels the older job. Threads cannot be interrupted, so a job
+that is already running is cancelled cooperatively: it calls check()
+between stages and stops with Cancelled once superseded.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_JOBS = 1024
+
+
+class Cancelled(Exception):
+    """Raised inside a job whose snapshot has been superseded"""
+
+
+class Job:
+    """One submitted computation for a snapshot version"""
+    __slots__ = ('version', 'future', '_cancelled')
+
+    def __init__(self, version):
+        self.version = version
+        self.future = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Drop the job if it has not started; otherwise make its next check() raise"""
+        self._cancelled.set()
+        self.future.cancel()
+
+    def check(self):
+        """Raise Cancelled if the job has been superseded; call between stages of a job"""
+        if self._cancelled.is_set():
+            raise Cancelled(f"snapshot {self.version} was superseded")
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=0.0):
+        """The job's result, or None if it is not ready within timeout seconds"""
+        try:
+            return self.future.result(timeout=timeout)
+        except TimeoutError:
+            return None
+
+
+class AnalyticsPool:
+    """Thread pool running at most one job per key, shared by every session in the process.
+
+    Once more than max_jobs keys are tracked, finished jobs are forgotten
+    least recently used first. Queued and running jobs are never evicted,
+    so a busy server cannot cancel live sessions' work; only a newer
+    snapshot for the same key cancels a job.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_jobs=DEFAULT_MAX_JOBS):
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ecoride-analytics')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def submit(self, key, version, fn, *args):
+        """Job running fn(job, *args) for a snapshot version.
+
+        The job already submitted under key is reused while its version
+        matches and cancelled otherwise, so fn only runs once per snapshot.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.version == version and not job.cancelled:
+                self._jobs.move_to_end(key)
+                return job
+            if job is not None:
+                job.cancel()
+            job = self._jobs[key] = Job(version)
+            self._jobs.move_to_end(key)
+            job.future = self._executor.submit(fn, job, *args)
+            if len(self._jobs) > self.max_jobs:
+                self._evict_finished()
+        return job
+
+    def cancel(self, key):
+        """Cancel and forget the job under key, if any"""
+        with self._lock:
+            job = self._jobs.pop(key, None)
+        if job is not None:
+            job.cancel()
+
+    def _evict_finished(self):
+        # Caller holds the lock; iteration runs least recently used first
+        for key in [key for key, job in self._jobs.items() if job.done()]:
+            if len(self._jobs) <= self.max_jobs:
+                break
+            del self._jobs[key]
+
+    def shutdown(self):
+        """Cancel every job and stop the worker threads"""
+        with self._lock:
+            jobs, self._jobs = list(self._jobs.values()), OrderedDict()
+        for job in jobs:
+            job.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
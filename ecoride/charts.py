@@ -0,0 +1,158 @@
+"""Bounded-size Plotly figures for trip histories, cached by a hash of their data.
+
+Trend charts are drawn from rollup buckets rather than trips, so their size
+depends on the date range and granularity, never on the number of trips.
+The 'auto' granularity picks the finest bucket that keeps a chart within
+MAX_BUCKETS bars. Finer series than that switch to WebGL line traces,
+min/max-decimated to MAX_POINTS per mode.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+
+from .rollups import FIELDS, GRANULARITIES, MODE_LABELS
+
+# Buckets per chart drawn as bars; longer series become WebGL lines
+MAX_BUCKETS = 366
+# Points per WebGL trace after min/max decimation
+MAX_POINTS = 2000
+DEFAULT_CACHE_SIZE = 64
+
+_DAYS_PER_BUCKET = {'day': 1, 'week': 7, 'month': 30.44, 'quarter': 91.31, 'year': 365.25}
+
+
+def auto_granularity(start, end, max_buckets=MAX_BUCKETS):
+    """Finest granularity that splits start..end into at most max_buckets buckets"""
+    days = (end - start).days + 1
+    for granularity in GRANULARITIES:
+        if days / _DAYS_PER_BUCKET[granularity] <= max_buckets:
+            return granularity
+    return GRANULARITIES[-1]
+
+
+def minmax_downsample(x, y, max_points=MAX_POINTS):
+    """Keep the first, last, smallest and largest point of each of max_points // 2 slices of a series.
+
+    Peaks and troughs survive, so a decimated line looks like the full one
+    at screen resolution.
+    """
+    n = len(y)
+    if n <= max_points:
+        return x, y
+    slices = max(max_points // 2, 1)
+    slice_ids = np.arange(n) * slices // n
+    order = np.lexsort((y, slice_ids))
+    starts = np.searchsorted(slice_ids[order], np.arange(slices))
+    ends = np.append(starts[1:], n) - 1
+    keep = np.unique(np.concatenate([order[starts], order[ends], [0, n - 1]]))
+    return x[keep], y[keep]
+
+
+def data_key(*parts):
+    """Stable hash of arrays and plain values, used to key cached figures"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(f"{part.dtype.str}{part.shape}".encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """Thread-safe LRU of built figures, shared by every session in the process.
+
+    Figures are treated as read-only once cached; two sessions charting the
+    same data get the same object.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._figures)
+
+    def get_or_build(self, key, build):
+        """Return the figure cached under key, building (outside the lock) and caching it on a miss"""
+        with self._lock:
+            figure = self._figures.get(key)
+            if figure is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+                return figure
+            self.misses += 1
+        figure = build()
+        with self._lock:
+            self._figures[key] = figure
+            while len(self._figures) > self.maxsize:
+                self._figures.popitem(last=False)
+        return figure
+
+
+def series_arrays(series):
+    """RollupIndex.series() rows as (datetime64[D] periods, periods x modes x FIELDS values)"""
+    if not series:
+        return np.array([], dtype='datetime64[D]'), np.zeros((0, len(MODE_LABELS), len(FIELDS)))
+    periods, values = zip(*series)
+    return np.array(periods, dtype='datetime64[D]'), np.stack(values)
+
+
+def trend_figure(periods, values, granularity):
+    """Distance per bucket and transport mode: stacked bars, or WebGL lines for long series"""
+    used = np.flatnonzero(values[:, :, FIELDS.index('trips')].sum(axis=0) > 0.5)
+    distance = values[:, :, FIELDS.index('distance')]
+    traces = []
+    if len(periods) <= MAX_BUCKETS:
+        for code in used:
+            traces.append(go.Bar(
+                x=periods, y=distance[:, code], name=MODE_LABELS[code],
+                customdata=values[:, code, 1:],
+                hovertemplate="%{x}<br>%{y:.1f} km<br>₹%{customdata[0]:.2f}<br>%{customdata[1]:.0f}g CO₂"
+                              "<br>%{customdata[2]:.0f} trips",
+            ))
+    else:
+        for code in used:
+            x, y = minmax_downsample(periods, distance[:, code])
+            traces.append(go.Scattergl(x=x, y=y, mode='lines', name=MODE_LABELS[code],
+                                       hovertemplate="%{x}<br>%{y:.1f} km"))
+    return go.Figure(data=traces, layout=dict(
+        title=f"📏 Distance per {granularity}", barmode='relative',
+        xaxis_title='Period', yaxis_title='Distance (km)', legend_title_text='Transport',
+    ))
+
+
+def daily_figure(rows):
+    """Stacked distance per weekday and mode from RunningAggregate.daily_rows()"""
+    traces = {}
+    for row in rows:
+        trace = traces.setdefault(row['Transport'], {'x': [], 'y': [], 'customdata': []})
+        trace['x'].append(row['Day'])
+        trace['y'].append(row['Distance'])
+        trace['customdata'].append((row['Cost'], row['Emission']))
+    return go.Figure(
+        data=[
+            go.Bar(name=mode, **trace,
+                   hovertemplate="%{x}<br>%{y:.1f} km<br>₹%{customdata[0]:.2f}<br>%{customdata[1]:.0f}g CO₂")
+            for mode, trace in traces.items()
+        ],
+        layout=dict(title='📏 Daily Distance Traveled', barmode='relative', showlegend=True,
+                    xaxis_title='Day', yaxis_title='Distance', legend_title_text='Transport'),
+    )
+
+
+def mode_share_figure(modes, distances):
+    """Share of distance per transport mode"""
+    return go.Figure(
+        data=[go.Pie(labels=list(modes), values=list(distances), textposition='inside', textinfo='percent+label')],
+        layout=dict(title='🚀 Distance by Transport Mode'),
+    )
+
@@ -0,0 +1,56 @@
+"""Vectorized cost/emission engine over interned transport mode codes."""
+import numpy as np
+import pandas as pd
+
+from .factors import MODE_CODES, UNKNOWN_MODE
+from .registry import get_registry
+
+
+def encode_modes(transport_types):
+    """Intern transport type labels into an array of integer mode codes"""
+    if hasattr(transport_types, 'cat'):
+        # Categorical series: only the categories need a dictionary lookup
+        categories = transport_types.cat.categories
+        lookup = np.array([MODE_CODES.get(mode, UNKNOWN_MODE) for mode in categories] + [UNKNOWN_MODE], dtype=np.intp)
+        return lookup[transport_types.cat.codes.to_numpy()]
+
+    values = transport_types if isinstance(transport_types, pd.Series) else np.asarray(transport_types)
+    if values.dtype.kind in 'iu':
+        # Already interned; clamp out-of-range codes to the fallback slot
+        codes = np.asarray(values, dtype=np.intp)
+        return np.where((codes < 0) | (codes > UNKNOWN_MODE), UNKNOWN_MODE, codes)
+
+    # Hash-factorize the labels so the dictionary lookup runs once per distinct mode
+    if not isinstance(values, pd.Series):
+        values = np.asarray(values, dtype=object).reshape(-1)
+    inverse, uniques = pd.factorize(values, use_na_sentinel=False)
+    lookup = np.array([MODE_CODES.get(mode, UNKNOWN_MODE) for mode in uniques], dtype=np.intp)
+    return lookup[inverse]
+
+
+def calculate_batch(distances, transport_types, trip_dates=None):
+    """Calculate cost and emission arrays for many trips in one pass.
+
+    trip_dates, if given, prices each trip with the factors in effect on its
+    date; otherwise today's factors apply.
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    codes = encode_modes(transport_types)
+    if distances.shape != codes.shape:
+        raise ValueError(
+            f"distances and transport_types must have the same length ({distances.shape} vs {codes.shape})"
+        )
+    return get_registry().price(distances, codes, trip_dates)
+
+
+def calculate_frame(df, distance_col='actual_distance', transport_col='transport_type', date_col='trip_date'):
+    """Return a copy of a trips DataFrame with 'cost' and 'emission' columns filled in"""
+    trip_dates = df[date_col].to_numpy() if date_col in df.columns else None
+    cost, emission = calculate_batch(df[distance_col].to_numpy(), df[transport_col], trip_dates)
+    return df.assign(cost=cost, emission=emission)
+
+
+def calculate_emissions_and_cost(distance, transport_type, trip_date=None):
+    """Calculate cost and emissions based on transport type and distance, at the factors valid on trip_date"""
+    cost, emission = calculate_batch([distance], [transport_type], None if trip_date is None else [trip_date])
+    return float(cost[0]), float(emission[0])
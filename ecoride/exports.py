@@ -0,0 +1,155 @@
+"""Streamed full-history trip exports as NDJSON, Parquet or Arrow IPC.
+
+    python -m ecoride.exports USER OUTPUT [--db ecoride.db] [--format ndjson|parquet|arrow]
+                              [--compression none|gzip|zstd]
+
+Trips are read from the store one chunk at a time and written straight to
+the output, so peak memory depends on the chunk size, not on how long the
+history is. Parquet and Arrow use their own gzip/zstd codecs; NDJSON is
+wrapped in a gzip stream or written as one zstd frame per chunk.
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+from .store import TRIP_FIELDS, TripStore
+
+# format -> (file suffix, MIME type)
+FORMATS = {
+    'ndjson': ('.ndjson', 'application/x-ndjson'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('.arrows', 'application/vnd.apache.arrow.stream'),
+}
+COMPRESSIONS = ('none', 'gzip', 'zstd')
+COLUMNS = ('trip_date', *TRIP_FIELDS)
+DEFAULT_CHUNKSIZE = 50_000
+
+_STRING_COLUMNS = ('destination', 'transport_type', 'trip_type')
+
+
+def export_filename(name, fmt, compression='none'):
+    """Download name for an export; compressed NDJSON and gzipped Arrow get an outer suffix"""
+    suffix = FORMATS[fmt][0]
+    if fmt == 'ndjson' and compression != 'none':
+        suffix += {'gzip': '.gz', 'zstd': '.zst'}[compression]
+    elif fmt == 'arrow' and compression == 'gzip':
+        suffix += '.gz'
+    return f"{name}_trips{suffix}"
+
+
+def export_mime(fmt, compression='none'):
+    """MIME type of an export, accounting for an outer gzip/zstd layer"""
+    filename = export_filename('', fmt, compression)
+    if filename.endswith('.gz'):
+        return 'application/gzip'
+    if filename.endswith('.zst'):
+        return 'application/zstd'
+    return FORMATS[fmt][1]
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("Parquet, Arrow and zstd exports require pyarrow (pip install pyarrow)") from e
+    return pa
+
+
+def _schema(pa):
+    return pa.schema([
+        ('trip_date', pa.date32()),
+        *((column, pa.string() if column in _STRING_COLUMNS else pa.float64()) for column in TRIP_FIELDS),
+    ])
+
+
+def _record_batch(pa, schema, rows):
+    columns = list(zip(*rows))
+    arrays = [pa.array(columns[0], pa.string()).cast(pa.date32())]
+    arrays += [pa.array(values, field.type) for values, field in zip(columns[1:], list(schema)[1:])]
+    return pa.record_batch(arrays, schema=schema)
+
+
+def write_ndjson(chunks, fileobj, compression='none'):
+    """Write trip row chunks as one JSON object per line; returns the number of trips written"""
+    out = gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=6) if compression == 'gzip' else fileobj
+    # Concatenated zstd frames form one valid stream, so each chunk is compressed on its own
+    codec = _pyarrow().Codec('zstd') if compression == 'zstd' else None
+    count = 0
+    for rows in chunks:
+        data = ('\n'.join(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False) for row in rows) + '\n').encode('utf-8')
+        out.write(codec.compress(data, asbytes=True) if codec is not None else data)
+        count += len(rows)
+    if out is not fileobj:
+        # Closing the gzip layer writes its trailer but leaves fileobj open
+        out.close()
+    return count
+
+
+def write_parquet(chunks, fileobj, compression='none'):
+    """Write trip row chunks as one Parquet row group each; returns the number of trips written"""
+    pa = _pyarrow()
+    import pyarrow.parquet as pq
+
+    schema = _schema(pa)
+    count = 0
+    with pq.ParquetWriter(fileobj, schema, compression=compression) as writer:
+        for rows in chunks:
+            writer.write_batch(_record_batch(pa, schema, rows))
+            count += len(rows)
+    return count
+
+
+def write_arrow(chunks, fileobj, compression='none'):
+    """Write trip row chunks as an Arrow IPC stream; returns the number of trips written"""
+    pa = _pyarrow()
+    schema = _schema(pa)
+    out = gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=6) if compression == 'gzip' else fileobj
+    # IPC compresses record batch buffers itself, but only supports zstd/lz4
+    options = pa.ipc.IpcWriteOptions(compression='zstd' if compression == 'zstd' else None)
+    count = 0
+    with pa.ipc.new_stream(out, schema, options=options) as writer:
+        for rows in chunks:
+            writer.write_batch(_record_batch(pa, schema, rows))
+            count += len(rows)
+    if out is not fileobj:
+        out.close()
+    return count
+
+
+_WRITERS = {'ndjson': write_ndjson, 'parquet': write_parquet, 'arrow': write_arrow}
+
+
+def export_trips(store, user, fileobj, fmt='ndjson', compression='none', chunksize=DEFAULT_CHUNKSIZE):
+    """Stream a user's whole trip history from the store into a binary file object"""
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unknown export format '{fmt}' (expected one of {', '.join(FORMATS)})")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{compression}' (expected one of {', '.join(COMPRESSIONS)})")
+    return _WRITERS[fmt](store.trip_chunks(user, chunksize), fileobj, compression)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a user's full trip history")
+    parser.add_argument('user')
+    parser.add_argument('output', help="output file ('-' for stdout)")
+    parser.add_argument('--db', default=os.environ.get('ECORIDE_DB', 'ecoride.db'), help="trip database path")
+    parser.add_argument('--format', choices=FORMATS, default='ndjson')
+    parser.add_argument('--compression', choices=COMPRESSIONS, default='none')
+    args = parser.parse_args(argv)
+
+    store = TripStore(args.db)
+    start = time.perf_counter()
+    if args.output == '-':
+        count = export_trips(store, args.user, sys.stdout.buffer, args.format, args.compression)
+    else:
+        with open(args.output, 'wb') as f:
+            count = export_trips(store, args.user, f, args.format, args.compression)
+    store.close()
+    print(f"Exported {count} trip(s) in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Emission and cost factors loaded from the versioned factor file; no third-party imports.
+
+The file (data/factors.json, or the path in ECORIDE_FACTORS) lists the
+transport modes in display order and one or more pricing periods, each
+effective from its date until the next period starts. A period only needs
+the factors that changed; the rest carry over from the period before.
+Only the mode list is read here, and it is fixed at start-up because mode
+codes are stored with every trip. Factors are looked up through
+ecoride.registry.get_registry(), which picks up edits to the file.
+"""
+import json
+import os
+from datetime import date
+from pathlib import Path
+
+FACTORS_FILE = Path(os.environ.get('ECORIDE_FACTORS') or Path(__file__).resolve().parent / 'data' / 'factors.json')
+
+
+def read_factor_file(path=FACTORS_FILE):
+    """Parse and validate a factor file.
+
+    Returns a dict with 'version', 'modes', 'fallback' ({'emission', 'cost'})
+    and 'periods' as [(effective_from date, emission dict, cost dict)] sorted
+    by date, with every period's dicts filled in from the periods before it.
+    """
+    with open(path, encoding='utf-8') as f:
+        spec = json.load(f)
+
+    modes = tuple(spec.get('modes') or ())
+    if not modes:
+        raise ValueError(f"Factor file {path} lists no transport modes")
+    if not spec.get('periods'):
+        raise ValueError(f"Factor file {path} has no pricing periods")
+    if 'emission' not in spec.get('fallback', {}) or 'cost' not in spec.get('fallback', {}):
+        raise ValueError(f"Factor file {path} must give fallback 'emission' and 'cost' factors")
+
+    periods = []
+    emission, cost = {}, {}
+    for period in sorted(spec['periods'], key=lambda p: p['effective_from']):
+        unknown = (set(period.get('emission', {})) | set(period.get('cost', {}))) - set(modes)
+        if unknown:
+            raise ValueError(f"Factor file {path} prices unlisted mode(s): {', '.join(sorted(unknown))}")
+        emission = {**emission, **period.get('emission', {})}
+        cost = {**cost, **period.get('cost', {})}
+        periods.append((date.fromisoformat(period['effective_from']), emission, cost))
+
+    return {
+        'version': str(spec.get('version', '')),
+        'modes': modes,
+        'fallback': {'emission': float(spec['fallback']['emission']), 'cost': float(spec['fallback']['cost'])},
+        'periods': periods,
+    }
+
+
+_SPEC = read_factor_file()
+
+# Transport modes in display order; a mode's position is its interned code
+TRANSPORT_MODES = _SPEC['modes']
+
+MODE_CODES = {mode: code for code, mode in enumerate(TRANSPORT_MODES)}
+UNKNOWN_MODE = len(TRANSPORT_MODES)
@@ -0,0 +1,114 @@
+"""Offline gazetteer: place-name lookup, nearest-place search and great-circle distances."""
+import csv
+import functools
+import os
+from pathlib import Path
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_PLACES = Path(__file__).resolve().parent / 'data' / 'places.csv'
+
+
+def normalize_place(name):
+    """Case- and whitespace-insensitive lookup key; 'Pune, Maharashtra' matches 'Pune'"""
+    return ' '.join(str(name).split(',')[0].split()).casefold()
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; accepts scalars or broadcastable arrays of degrees"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _unit_vectors(lats, lons):
+    lats, lons = np.radians(lats), np.radians(lons)
+    return np.column_stack((np.cos(lats) * np.cos(lons), np.cos(lats) * np.sin(lons), np.sin(lats)))
+
+
+class Gazetteer:
+    """Places with a hash index on normalized names and a KD-tree on their positions.
+
+    Points are indexed as 3-D unit vectors, so straight-line nearest
+    neighbours are exactly the great-circle nearest neighbours with no
+    wrap-around at the antimeridian. Name lookups are dictionary hits and
+    nearest-place queries are O(log n), which keeps both well under a
+    millisecond for hundreds of thousands of places.
+    """
+
+    def __init__(self, names, lats, lons, aliases=None):
+        self.names = list(names)
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self._index = {}
+        for i, name in enumerate(self.names):
+            self._index.setdefault(normalize_place(name), i)
+        for alias, name in (aliases or {}).items():
+            i = self._index.get(normalize_place(name))
+            if i is not None:
+                self._index.setdefault(normalize_place(alias), i)
+        self._tree = cKDTree(_unit_vectors(self.lats, self.lons)) if self.names else None
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_csv(cls, path):
+        """Load a name,lat,lon CSV; an optional 'aliases' column holds |-separated alternative names"""
+        names, lats, lons, aliases = [], [], [], {}
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                names.append(row['name'])
+                lats.append(float(row['lat']))
+                lons.append(float(row['lon']))
+                for alias in filter(None, (row.get('aliases') or '').split('|')):
+                    aliases[alias] = row['name']
+        return cls(names, lats, lons, aliases)
+
+    def lookup(self, name):
+        """Index of a place by name or alias, or None"""
+        return self._index.get(normalize_place(name))
+
+    def distance_km(self, origin, destination):
+        """Great-circle distance between two named places, or None if either is unknown"""
+        i, j = self.lookup(origin), self.lookup(destination)
+        if i is None or j is None:
+            return None
+        return float(haversine_km(self.lats[i], self.lons[i], self.lats[j], self.lons[j]))
+
+    def distances_km(self, origins, destinations):
+        """Vectorized distance_km over equal-length (or scalar-broadcast) name sequences; NaN where unknown"""
+        origins = [origins] if isinstance(origins, str) else origins
+        destinations = [destinations] if isinstance(destinations, str) else destinations
+        i = np.array([self._index.get(normalize_place(name), -1) for name in origins], dtype=np.intp)
+        j = np.array([self._index.get(normalize_place(name), -1) for name in destinations], dtype=np.intp)
+        if not len(self):
+            return np.full(np.broadcast(i, j).shape, np.nan)
+        distances = haversine_km(self.lats[i], self.lons[i], self.lats[j], self.lons[j])
+        return np.where((i < 0) | (j < 0), np.nan, distances)
+
+    def nearest(self, lat, lon, k=1):
+        """The k places closest to a position as [(name, km)], nearest first"""
+        if self._tree is None:
+            return []
+        k = min(k, len(self))
+        _, indexes = self._tree.query(_unit_vectors(np.atleast_1d(lat), np.atleast_1d(lon))[0], k=k)
+        indexes = np.atleast_1d(indexes)
+        distances = haversine_km(lat, lon, self.lats[indexes], self.lons[indexes])
+        return [(self.names[i], float(km)) for i, km in zip(indexes, np.atleast_1d(distances))]
+
+    def near(self, name, k=5):
+        """The k places closest to a named place, excluding it, as [(name, km)]; [] if it is unknown"""
+        i = self.lookup(name)
+        if i is None:
+            return []
+        return [(place, km) for place, km in self.nearest(self.lats[i], self.lons[i], k + 1)
+                if place != self.names[i]][:k]
+
+
+@functools.lru_cache(maxsize=4)
+def load_gazetteer(path=None):
+    """Load (once per process) the gazetteer at path, ECORIDE_GAZETTEER, or the bundled places file"""
+    return Gazetteer.from_csv(path or os.environ.get('ECORIDE_GAZETTEER') or DEFAULT_PLACES)
@@ -0,0 +1,142 @@
+"""Chunked bulk import of trip logs from CSV, JSON Lines or Parquet files."""
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .emissions import calculate_batch, encode_modes
+from .factors import MODE_CODES, TRANSPORT_MODES, UNKNOWN_MODE
+
+REQUIRED_COLUMNS = ('trip_date', 'transport_type', 'distance')
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.parquet': 'parquet'}
+DEFAULT_CHUNKSIZE = 10_000
+# Trips dated further ahead than this are rejected as typos (e.g. 2255 for 2025)
+MAX_FUTURE_DAYS = 366
+
+# Exports often drop the emoji prefix, so "Bus" or "car (petrol)" map onto the factor table too
+MODE_ALIASES = {mode.split(' ', 1)[1].lower(): mode for mode in TRANSPORT_MODES}
+
+
+@dataclass
+class ImportResult:
+    """Outcome of a bulk import"""
+    rows_imported: int = 0
+    rows_rejected: int = 0
+    seconds: float = 0.0
+    distance: float = 0.0
+    cost: float = 0.0
+    emission: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        total = self.rows_imported + self.rows_rejected
+        return total / self.seconds if self.seconds else 0.0
+
+
+def detect_format(filename):
+    """Infer the import format from a file name's extension"""
+    suffix = Path(filename).suffix.lower()
+    if suffix not in FORMATS:
+        raise ValueError(f"Unsupported trip file type '{suffix}' (expected one of {', '.join(FORMATS)})")
+    return FORMATS[suffix]
+
+
+def iter_chunks(source, fmt, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield DataFrame chunks from a path or file-like object without reading it whole"""
+    if fmt == 'csv':
+        yield from pd.read_csv(source, chunksize=chunksize)
+    elif fmt == 'jsonl':
+        yield from pd.read_json(source, lines=True, chunksize=chunksize)
+    elif fmt == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet import requires pyarrow (pip install pyarrow)") from e
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unknown trip file format '{fmt}'")
+
+
+def normalize_modes(transport_types):
+    """Map transport labels onto the factor table's names, leaving unknown ones as-is"""
+    labels = transport_types.astype(str).str.strip()
+    known = labels.isin(MODE_CODES.keys())
+    aliased = labels.str.lower().map(MODE_ALIASES)
+    return labels.where(known | aliased.isna(), aliased)
+
+
+def prepare_chunk(chunk):
+    """Validate and price one chunk; returns (priced rows, number of rejected rows)"""
+    missing = [column for column in REQUIRED_COLUMNS if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Trip file is missing required column(s): {', '.join(missing)}")
+
+    transport_type = normalize_modes(chunk['transport_type'])
+    mode_code = encode_modes(transport_type)
+    distance = pd.to_numeric(chunk['distance'], errors='coerce').to_numpy(dtype=np.float64)
+    trip_date = pd.to_datetime(chunk['trip_date'], errors='coerce')
+    trip_type = chunk['trip_type'].fillna('One-way') if 'trip_type' in chunk.columns else pd.Series('One-way', index=chunk.index)
+
+    valid = (
+        (mode_code != UNKNOWN_MODE)
+        & np.isfinite(distance) & (distance >= 0)
+        & trip_date.notna().to_numpy()
+        & (trip_date <= pd.Timestamp(date.today() + timedelta(days=MAX_FUTURE_DAYS))).to_numpy()
+        & trip_type.isin(['One-way', 'Round-trip']).to_numpy()
+    )
+
+    actual_distance = distance * np.where(trip_type.to_numpy() == 'Round-trip', 2, 1)
+    # Historical rows are priced with the factors in effect on their own dates
+    cost, emission = calculate_batch(actual_distance, mode_code, trip_date.to_numpy())
+    prepared = pd.DataFrame({
+        'trip_date': trip_date.dt.strftime('%Y-%m-%d'),
+        'destination': chunk['destination'].fillna('').astype(str) if 'destination' in chunk.columns else '',
+        'transport_type': transport_type,
+        'mode_code': mode_code,
+        'distance': distance,
+        'actual_distance': actual_distance,
+        'trip_type': trip_type,
+        'cost': cost,
+        'emission': emission,
+    }, index=chunk.index)
+    return prepared[valid], int((~valid).sum())
+
+
+def import_trips(store, user, source, fmt, chunksize=DEFAULT_CHUNKSIZE, progress=None):
+    """Stream a trip file into the store chunk by chunk.
+
+    progress, if given, is called after every chunk with the running
+    ImportResult and the fraction of the input consumed (None when unknown).
+    """
+    result = ImportResult()
+    total_bytes = _size(source)
+    start = time.perf_counter()
+
+    for chunk in iter_chunks(source, fmt, chunksize):
+        prepared, rejected = prepare_chunk(chunk)
+        result.rows_imported += store.append_frame(user, prepared)
+        result.rows_rejected += rejected
+        result.distance += float(prepared['actual_distance'].sum())
+        result.cost += float(prepared['cost'].sum())
+        result.emission += float(prepared['emission'].sum())
+        result.seconds = time.perf_counter() - start
+        if progress is not None:
+            fraction = min(source.tell() / total_bytes, 1.0) if total_bytes else None
+            progress(result, fraction)
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def _size(source):
+    """Byte size of a seekable file-like source, or None for paths/unseekable streams"""
+    if not hasattr(source, 'seek') or not hasattr(source, 'tell'):
+        return None
+    position = source.tell()
+    size = source.seek(0, 2)
+    source.seek(position)
+    return size or None
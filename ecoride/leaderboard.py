@@ -0,0 +1,156 @@
+"""Process-wide user and city leaderboards kept current by every session's saves."""
+import heapq
+import threading
+from collections import OrderedDict
+
+METRICS = ('distance', 'cost', 'emission', 'trips')
+DEFAULT_MAX_USERS = 10_000
+_MAX_CACHED_RANKINGS = 256
+
+# Row layout of the per-user and per-city totals
+_CITY, _DISTANCE, _COST, _EMISSION, _TRIPS = range(5)
+_METRIC_SLOTS = {'distance': _DISTANCE, 'cost': _COST, 'emission': _EMISSION, 'trips': _TRIPS}
+
+
+class Leaderboard:
+    """Running totals per user and per city, shared by every session in the process.
+
+    Per-user rows are kept for the max_users most recently active users,
+    the least recently active being evicted first. City totals always cover
+    everyone. An evicted user's row is reloaded from the store the next time
+    they save, so totals stay exact. Each write is applied as a signed delta
+    by the session that made it, so nothing is recomputed org-wide, and
+    rankings are memoized per version so concurrent readers share one sort.
+    """
+
+    def __init__(self, store=None, max_users=DEFAULT_MAX_USERS):
+        self._store = store
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._users = OrderedDict()
+        self._cities = {}
+        self._rankings = {}
+        self.version = 0
+
+    @classmethod
+    def from_store(cls, store, max_users=DEFAULT_MAX_USERS):
+        """Build the board from one aggregate pass over the store"""
+        board = cls(store, max_users)
+        # Rows come least recently active first, so eviction keeps the most active users
+        for user, city, distance, cost, emission, trips, _ in store.user_totals():
+            board._add_city(city, distance, cost, emission, trips)
+            board._users[user] = [city, distance, cost, emission, trips]
+            board._evict()
+        return board
+
+    def __len__(self):
+        return len(self._users)
+
+    # Updates
+
+    def add(self, user, distance=0.0, cost=0.0, emission=0.0, trips=0):
+        """Apply a signed change to a user's totals; call after the change is written to the store"""
+        with self._lock:
+            row = self._users.get(user)
+            if row is None:
+                row = self._load(user)
+                if self._store is None:
+                    row[_DISTANCE:] = [row[_DISTANCE] + distance, row[_COST] + cost,
+                                       row[_EMISSION] + emission, row[_TRIPS] + trips]
+            else:
+                self._users.move_to_end(user)
+                row[_DISTANCE] += distance
+                row[_COST] += cost
+                row[_EMISSION] += emission
+                row[_TRIPS] += trips
+            self._add_city(row[_CITY], distance, cost, emission, trips)
+            self._changed()
+
+    def apply(self, user, added=(), removed=()):
+        """Add and remove trip dicts (actual_distance, cost, emission) as one delta"""
+        added, removed = list(added), list(removed)
+        self.add(
+            user,
+            sum(trip['actual_distance'] for trip in added) - sum(trip['actual_distance'] for trip in removed),
+            sum(trip['cost'] for trip in added) - sum(trip['cost'] for trip in removed),
+            sum(trip['emission'] for trip in added) - sum(trip['emission'] for trip in removed),
+            len(added) - len(removed),
+        )
+
+    def set_city(self, user, city):
+        """Move a user's totals to another city; call before the new profile is written to the store"""
+        with self._lock:
+            row = self._users.get(user)
+            if row is None:
+                row = self._load(user)
+            if row[_CITY] == city:
+                return
+            self._add_city(row[_CITY], -row[_DISTANCE], -row[_COST], -row[_EMISSION], -row[_TRIPS])
+            row[_CITY] = city
+            self._add_city(city, row[_DISTANCE], row[_COST], row[_EMISSION], row[_TRIPS])
+            self._changed()
+
+    # Queries
+
+    def top_users(self, metric='distance', n=10, city=None):
+        """Up to n (user, city, distance, cost, emission, trips) rows with the largest metric"""
+        slot = _METRIC_SLOTS[metric]
+        key = ('users', metric, n, city)
+        with self._lock:
+            ranking = self._rankings.get(key)
+            if ranking is None:
+                rows = ((user, *row) for user, row in self._users.items() if city is None or row[_CITY] == city)
+                ranking = self._remember(key, heapq.nlargest(n, rows, key=lambda row: row[slot + 1]))
+        return ranking
+
+    def top_cities(self, metric='distance', n=10):
+        """Up to n (city, distance, cost, emission, trips) rows with the largest metric"""
+        slot = _METRIC_SLOTS[metric]
+        key = ('cities', metric, n)
+        with self._lock:
+            ranking = self._rankings.get(key)
+            if ranking is None:
+                rows = ((city, *totals) for city, totals in self._cities.items() if totals[3] > 0)
+                ranking = self._remember(key, heapq.nlargest(n, rows, key=lambda row: row[slot]))
+        return ranking
+
+    def user_row(self, user):
+        """(city, distance, cost, emission, trips) for one cached user, or None"""
+        with self._lock:
+            row = self._users.get(user)
+            return tuple(row) if row is not None else None
+
+    # Internals; callers hold the lock
+
+    def _load(self, user):
+        rows = self._store.user_totals(user) if self._store is not None else []
+        if rows:
+            _, city, distance, cost, emission, trips, _ = rows[0]
+            row = [city, distance, cost, emission, trips]
+        else:
+            profile = self._store.load_profile(user) if self._store is not None else None
+            row = [profile['city'] if profile else '', 0.0, 0.0, 0.0, 0]
+        self._users[user] = row
+        self._evict()
+        return row
+
+    def _evict(self):
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+
+    def _add_city(self, city, distance, cost, emission, trips):
+        totals = self._cities.setdefault(city, [0.0, 0.0, 0.0, 0])
+        totals[0] += distance
+        totals[1] += cost
+        totals[2] += emission
+        totals[3] += trips
+
+    def _changed(self):
+        self.version += 1
+        self._rankings.clear()
+
+    def _remember(self, key, ranking):
+        if len(self._rankings) >= _MAX_CACHED_RANKINGS:
+            self._rankings.clear()
+        self._rankings[key] = ranking
+        return ranking
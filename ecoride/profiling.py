@@ -0,0 +1,142 @@
+"""Opt-in per-section timing with rolling percentiles and JSON/Prometheus export."""
+import json
+import os
+import threading
+import time
+from collections import deque
+
+DEFAULT_WINDOW = 1000
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class _NullSection:
+    """Shared no-op context manager handed out while profiling is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class _Section:
+    __slots__ = ('_profiler', '_name', '_start')
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._profiler.record(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class Profiler:
+    """Rolling timings per named section, shared by every session in the process.
+
+    While disabled, section() returns a shared no-op context manager, so
+    instrumented code pays one attribute check per section and nothing else.
+    """
+
+    def __init__(self, enabled=False, window=DEFAULT_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+        self._last_export = 0.0
+
+    @classmethod
+    def from_env(cls):
+        """Enable when ECORIDE_PROFILE is set to a truthy value"""
+        return cls(enabled=os.environ.get('ECORIDE_PROFILE', '').lower() in ('1', 'true', 'yes', 'on'))
+
+    def section(self, name):
+        """Context manager timing one section of the script"""
+        if not self.enabled:
+            return _NULL_SECTION
+        return _Section(self, name)
+
+    def record(self, name, seconds):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+                self._counts[name] = 0
+                self._totals[name] = 0.0
+            samples.append(seconds)
+            self._counts[name] += 1
+            # Lifetime total, so the exported _sum only ever grows like a Prometheus counter
+            self._totals[name] += seconds
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._totals.clear()
+
+    def stats(self):
+        """Summary per section: total count plus mean/max and quantiles over the rolling window, in ms"""
+        with self._lock:
+            snapshot = {name: (sorted(samples), self._counts[name]) for name, samples in self._samples.items()}
+        stats = {}
+        for name, (samples, count) in snapshot.items():
+            entry = {'count': count, 'mean_ms': sum(samples) / len(samples) * 1000, 'max_ms': samples[-1] * 1000}
+            for q in QUANTILES:
+                entry[f'p{round(q * 100)}_ms'] = _quantile(samples, q) * 1000
+            stats[name] = entry
+        return stats
+
+    def to_json(self):
+        return json.dumps({'generated_at': time.time(), 'sections': self.stats()}, indent=2)
+
+    def to_prometheus(self, metric='ecoride_section_seconds'):
+        """Prometheus text exposition: one summary per section with rolling quantiles"""
+        lines = [
+            f"# HELP {metric} Wall time spent in each instrumented section of a rerun.",
+            f"# TYPE {metric} summary",
+        ]
+        with self._lock:
+            snapshot = {name: (sorted(samples), self._counts[name], self._totals[name])
+                        for name, samples in self._samples.items()}
+        for name, (samples, count, total) in sorted(snapshot.items()):
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            for q in QUANTILES:
+                lines.append(f'{metric}{{section="{label}",quantile="{q}"}} {_quantile(samples, q):.6f}')
+            lines.append(f'{metric}_sum{{section="{label}"}} {total:.6f}')
+            lines.append(f'{metric}_count{{section="{label}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, directory):
+        """Write profile.json and profile.prom into directory, replacing them atomically"""
+        os.makedirs(directory, exist_ok=True)
+        for filename, content in (('profile.json', self.to_json()), ('profile.prom', self.to_prometheus())):
+            path = os.path.join(directory, filename)
+            with open(path + '.tmp', 'w') as f:
+                f.write(content)
+            os.replace(path + '.tmp', path)
+
+    def maybe_export(self, directory, interval=10.0):
+        """export() unless the previous export was less than interval seconds ago"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_export < interval:
+                return False
+            self._last_export = now
+        self.export(directory)
+        return True
+
+
+def _quantile(sorted_samples, q):
+    """Nearest-rank quantile of an already sorted, non-empty list"""
+    index = min(len(sorted_samples) - 1, max(0, round(q * len(sorted_samples)) - 1))
+    return sorted_samples[index]
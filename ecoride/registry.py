@@ -0,0 +1,182 @@
+"""Date-aware factor tables with memoized lookups, hot reload and bulk re-pricing.
+
+Run ``python -m ecoride.registry --db ecoride.db`` after editing the factor
+file to re-price the stored history with the factors valid on each trip's date.
+"""
+import argparse
+import bisect
+import os
+import sys
+import threading
+import time
+from datetime import date
+
+import numpy as np
+
+from .factors import FACTORS_FILE, TRANSPORT_MODES, read_factor_file
+
+# How often (seconds) get_registry() stats the factor file for changes
+RELOAD_CHECK_INTERVAL = 1.0
+_MAX_CACHED_DAYS = 4096
+
+
+def _stamp(path):
+    """Cheap change marker for a file: (mtime_ns, size), or None if it is missing"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _day_array(trip_dates):
+    """Coerce ISO strings, dates or datetime64 values to a datetime64[D] array; missing dates become today"""
+    dates = np.asarray(trip_dates)
+    days = dates.astype('datetime64[D]') if dates.dtype.kind == 'M' else np.asarray(dates, dtype='datetime64[D]')
+    # NaT sorts after every date, so searchsorted would otherwise price it with the last period
+    missing = np.isnat(days)
+    if missing.any():
+        days = np.where(missing, np.datetime64(date.today(), 'D'), days)
+    return days
+
+
+class FactorRegistry:
+    """Cost and emission tables for every pricing period of one factor file.
+
+    Tables are (periods x modes + 1) arrays indexed by this process's mode
+    codes, with the fallback factor in the last column. Modes added to the
+    file after start-up price at the fallback until the app restarts.
+    """
+
+    def __init__(self, spec, path=None, stamp=None):
+        self.version = spec['version']
+        self.path = path
+        self.stamp = stamp
+        fallback = spec['fallback']
+        self.starts = [start for start, _, _ in spec['periods']]
+        self._start_days = np.array(self.starts, dtype='datetime64[D]')
+        self.emission_tables = np.array(
+            [[emission.get(mode, fallback['emission']) for mode in TRANSPORT_MODES] + [fallback['emission']]
+             for _, emission, _ in spec['periods']],
+            dtype=np.float64,
+        )
+        self.cost_tables = np.array(
+            [[cost.get(mode, fallback['cost']) for mode in TRANSPORT_MODES] + [fallback['cost']]
+             for _, _, cost in spec['periods']],
+            dtype=np.float64,
+        )
+        self._by_day = {}
+
+    @classmethod
+    def from_file(cls, path=FACTORS_FILE):
+        stamp = _stamp(path)
+        return cls(read_factor_file(path), path, stamp)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def changed(self):
+        """Whether the backing file was modified since it was loaded"""
+        return self.path is not None and _stamp(self.path) != self.stamp
+
+    def period_index(self, day):
+        """Index of the period in effect on day; days before the first period use the first"""
+        return max(bisect.bisect_right(self.starts, day) - 1, 0)
+
+    def period_indexes(self, trip_dates):
+        """Vectorized period_index over many trip dates; missing (NaT) dates use today's period"""
+        indexes = np.searchsorted(self._start_days, _day_array(trip_dates), side='right') - 1
+        return np.maximum(indexes, 0)
+
+    def tables(self, day=None):
+        """(cost table, emission table) in effect on day (default: today), memoized per day"""
+        day = day or date.today()
+        try:
+            return self._by_day[day]
+        except KeyError:
+            pass
+        if len(self._by_day) >= _MAX_CACHED_DAYS:
+            self._by_day.clear()
+        period = self.period_index(day)
+        tables = self._by_day[day] = (self.cost_tables[period], self.emission_tables[period])
+        return tables
+
+    def price(self, distances, codes, trip_dates=None):
+        """(cost, emission) arrays for mode codes; trip_dates selects each trip's period (default: today)"""
+        if trip_dates is None or len(self) == 1:
+            cost_table, emission_table = self.tables()
+            return distances * cost_table[codes], distances * emission_table[codes]
+        periods = self.period_indexes(trip_dates)
+        return distances * self.cost_tables[periods, codes], distances * self.emission_tables[periods, codes]
+
+
+_lock = threading.Lock()
+_registry = None
+_checked = 0.0
+
+
+def get_registry():
+    """The process-wide registry, reloaded when the factor file changes.
+
+    The file is stat'ed at most once per RELOAD_CHECK_INTERVAL, so the hot
+    path is a clock read. A reload that fails to parse keeps the previous
+    tables and is retried on the next check.
+    """
+    global _registry, _checked
+    now = time.monotonic()
+    if _registry is not None and now - _checked < RELOAD_CHECK_INTERVAL:
+        return _registry
+    with _lock:
+        if _registry is None:
+            _registry = FactorRegistry.from_file(FACTORS_FILE)
+        elif _registry.changed():
+            try:
+                _registry = FactorRegistry.from_file(FACTORS_FILE)
+            except (OSError, ValueError, KeyError):
+                pass
+        _checked = now
+    return _registry
+
+
+def reprice_history(store, registry=None, user=None, chunksize=50_000):
+    """Re-price stored trips with the factors valid on their dates; returns the number of trips changed.
+
+    Works through the store in id-ordered chunks and only writes rows whose
+    cost or emission actually moved, so re-running after a no-op edit is cheap.
+    """
+    from .emissions import encode_modes
+
+    registry = registry or get_registry()
+    changed = 0
+    for rows in store.pricing_chunks(user, chunksize):
+        ids, trip_dates, mode_codes, distances, costs, emissions = zip(*rows)
+        cost, emission = registry.price(
+            np.array(distances, dtype=np.float64), encode_modes(np.array(mode_codes)), trip_dates,
+        )
+        moved = ~(np.isclose(cost, costs) & np.isclose(emission, emissions))
+        if moved.any():
+            index = np.flatnonzero(moved)
+            store.update_prices(zip(cost[index].tolist(), emission[index].tolist(), np.array(ids)[index].tolist()))
+            changed += len(index)
+    return changed
+
+
+def main(argv=None):
+    from .store import TripStore
+
+    parser = argparse.ArgumentParser(description="Re-price stored trips after a factor file update")
+    parser.add_argument('--db', default=os.environ.get('ECORIDE_DB', 'ecoride.db'), help="trip database path")
+    parser.add_argument('--user', default=None, help="only re-price this user's trips (default: everyone)")
+    args = parser.parse_args(argv)
+
+    registry = get_registry()
+    store = TripStore(args.db)
+    start = time.perf_counter()
+    changed = reprice_history(store, registry, args.user)
+    store.close()
+    print(f"Re-priced {changed} trip(s) with factors {registry.version} "
+          f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
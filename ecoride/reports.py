@@ -0,0 +1,151 @@
+"""Weekly JSON reports, interactively or in bulk across a process pool.
+
+    python -m ecoride.reports TRIPS_DIR OUTPUT_DIR [--week YYYY-MM-DD] [--workers N]
+
+TRIPS_DIR holds one trip log per user (CSV, JSON Lines or Parquet, in the
+bulk-import format) named after the user. An optional profiles.csv with
+name, vehicle and city columns fills in user_info. Each report is written
+to OUTPUT_DIR/<name>_travel_report.json as soon as its worker finishes.
+A user whose trip log cannot be read is reported and skipped; the run
+exits with status 1 if any user failed.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from pathlib import Path
+
+from .aggregates import RunningAggregate
+from .importer import FORMATS, iter_chunks, prepare_chunk
+from .store import TRIP_FIELDS, group_by_weekday, week_start
+
+PROFILES_FILE = 'profiles.csv'
+
+
+def build_report(user_info, weekly_data, aggregate=None):
+    """Assemble report_data (user_info, weekly_summary, daily_data) for one week"""
+    if aggregate is None:
+        aggregate = RunningAggregate.from_weekly_data(weekly_data)
+    return {
+        'user_info': {
+            'name': user_info.get('name', ''),
+            'vehicle': user_info.get('vehicle', ''),
+            'city': user_info.get('city', '')
+        },
+        'weekly_summary': {
+            'total_distance_km': aggregate.total_distance,
+            'total_cost_rs': aggregate.total_cost,
+            'total_emission_g': aggregate.total_emission,
+            'travel_days': aggregate.travel_days
+        },
+        'daily_data': weekly_data
+    }
+
+
+def report_filename(name):
+    return f"{name}_travel_report.json"
+
+
+def load_week(path, monday, chunksize=50_000):
+    """Stream one user's trip log and return the given week as weekly_data"""
+    first, last = monday.isoformat(), (monday + timedelta(days=6)).isoformat()
+    trips = []
+    for chunk in iter_chunks(path, FORMATS[path.suffix.lower()], chunksize):
+        prepared, _ = prepare_chunk(chunk)
+        in_week = prepared[(prepared['trip_date'] >= first) & (prepared['trip_date'] <= last)]
+        trips.extend(in_week[['trip_date', *TRIP_FIELDS]].to_dict('records'))
+    trips.sort(key=lambda trip: trip['trip_date'])
+    return group_by_weekday(trips)
+
+
+def _write_report(job):
+    """Worker entry point: build and write one user's report.
+
+    Returns (name, travel_days, None), or (name, None, error message) when
+    the user's log is malformed, so one bad file cannot end a batch run.
+    """
+    path, user_info, monday, output_dir = job
+    # Write to a temp name and rename so readers never see a half-written report
+    target = output_dir / report_filename(user_info['name'])
+    partial = target.with_suffix('.json.partial')
+    try:
+        report = build_report(user_info, load_week(path, monday))
+        partial.write_text(json.dumps(report, indent=2))
+        os.replace(partial, target)
+    except Exception as e:
+        partial.unlink(missing_ok=True)
+        return user_info['name'], None, f"{path.name}: {type(e).__name__}: {e}"
+    return user_info['name'], report['weekly_summary']['travel_days'], None
+
+
+def _write_reports(batch):
+    """Worker entry point for a batch of jobs; one task per batch keeps inter-process overhead low"""
+    return [_write_report(job) for job in batch]
+
+
+def load_profiles(trips_dir):
+    """Read profiles.csv from the trips directory, keyed by user name"""
+    path = trips_dir / PROFILES_FILE
+    if not path.exists():
+        return {}
+    with path.open(newline='') as f:
+        return {row['name']: row for row in csv.DictReader(f)}
+
+
+def generate_reports(trips_dir, output_dir, monday=None, workers=None):
+    """Write a weekly report for every trip log in trips_dir.
+
+    Yields (name, travel_days, error) as each batch completes; error is
+    None on success, and travel_days is None for a user whose report failed.
+    """
+    trips_dir, output_dir = Path(trips_dir), Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    monday = week_start(monday)
+    profiles = load_profiles(trips_dir)
+
+    jobs = [
+        (path, profiles.get(path.stem, {'name': path.stem}), monday, output_dir)
+        for path in sorted(trips_dir.iterdir())
+        if path.suffix.lower() in FORMATS and path.name != PROFILES_FILE
+    ]
+    workers = workers or os.cpu_count() or 1
+    batch_size = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_write_reports, jobs[i:i + batch_size]) for i in range(0, len(jobs), batch_size)]
+        # Completion order, so a slow user only holds back the rest of its own batch
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate weekly travel reports for every user in a directory")
+    parser.add_argument('trips_dir', type=Path)
+    parser.add_argument('output_dir', type=Path)
+    parser.add_argument('--week', type=date.fromisoformat, default=None,
+                        help="any date in the week to report on (default: this week)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    count = 0
+    failures = []
+    for name, travel_days, error in generate_reports(args.trips_dir, args.output_dir, args.week, args.workers):
+        if error is not None:
+            failures.append((name, error))
+            print(f"{name}: FAILED ({error})", file=sys.stderr)
+            continue
+        count += 1
+        print(f"{name}: {travel_days} travel day(s)")
+    print(f"Wrote {count} report(s) in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    if failures:
+        print(f"{len(failures)} report(s) failed: {', '.join(name for name, _ in failures)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""Per-day, per-mode rollups with prefix sums for fast date-range totals and trends."""
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+import numpy as np
+
+from .factors import MODE_CODES, TRANSPORT_MODES, UNKNOWN_MODE
+
+FIELDS = ('distance', 'cost', 'emission', 'trips')
+GRANULARITIES = ('day', 'week', 'month', 'quarter', 'year')
+MODE_LABELS = TRANSPORT_MODES + ('Other',)
+_N_MODES = len(MODE_LABELS)
+
+
+def _ordinal(value):
+    if not isinstance(value, date):
+        value = date.fromisoformat(str(value))
+    return value.toordinal()
+
+
+def bucket_start(day, granularity):
+    """First day of the week/month/quarter/year bucket containing day"""
+    if granularity == 'day':
+        return day
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    if granularity == 'quarter':
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    if granularity == 'year':
+        return day.replace(month=1, day=1)
+    raise ValueError(f"Unknown granularity '{granularity}' (expected one of {', '.join(GRANULARITIES)})")
+
+
+def next_bucket(start, granularity):
+    """First day of the bucket following the one starting at start"""
+    if granularity == 'day':
+        return start + timedelta(days=1)
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    months = {'month': 1, 'quarter': 3, 'year': 12}[granularity]
+    month = start.month - 1 + months
+    return start.replace(year=start.year + month // 12, month=month % 12 + 1, day=1)
+
+
+class RollupIndex:
+    """Day buckets of (distance, cost, emission, trips) per transport mode.
+
+    Buckets are kept sorted by date alongside a cumulative-sum array, so the
+    total for any date range is two binary searches and one subtraction, and
+    a week/month/quarter/year trend costs one such lookup per bucket no
+    matter how many trips fall inside it. Adding trips on or after the
+    latest day updates the prefix sums directly; edits further back mark
+    them stale and they are rebuilt on the next query.
+    """
+
+    def __init__(self):
+        self._ordinals = []
+        self._buckets = []
+        self._prefix = np.zeros((1, _N_MODES, len(FIELDS)))
+
+    def __len__(self):
+        return len(self._ordinals)
+
+    @classmethod
+    def from_daily_totals(cls, rows):
+        """Build from (trip_date, mode_code, distance, cost, emission, trips) rows, e.g. TripStore.daily_mode_totals()"""
+        index = cls()
+        by_day = {}
+        for trip_date, mode_code, distance, cost, emission, trips in rows:
+            bucket = by_day.get(trip_date)
+            if bucket is None:
+                bucket = by_day[trip_date] = np.zeros((_N_MODES, len(FIELDS)))
+            bucket[min(mode_code, UNKNOWN_MODE)] += (distance, cost, emission, trips)
+        for trip_date in sorted(by_day, key=_ordinal):
+            index._ordinals.append(_ordinal(trip_date))
+            index._buckets.append(by_day[trip_date])
+        index._prefix = None
+        return index
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from trip dicts carrying 'trip_date' plus TRIP_FIELDS"""
+        return cls.from_daily_totals(
+            (record['trip_date'], MODE_CODES.get(record['transport_type'], UNKNOWN_MODE),
+             record.get('actual_distance', record['distance']), record['cost'], record['emission'], 1)
+            for record in records
+        )
+
+    # Updates
+
+    def add(self, record, sign=1):
+        """Fold one trip dict ('trip_date' plus TRIP_FIELDS) into its day bucket; sign=-1 removes it"""
+        ordinal = _ordinal(record['trip_date'])
+        values = np.zeros((_N_MODES, len(FIELDS)))
+        values[MODE_CODES.get(record['transport_type'], UNKNOWN_MODE)] = (
+            record.get('actual_distance', record['distance']), record['cost'], record['emission'], 1)
+        values *= sign
+
+        i = bisect_left(self._ordinals, ordinal)
+        if i < len(self._ordinals) and self._ordinals[i] == ordinal:
+            self._buckets[i] += values
+            if self._buckets[i][:, 3].sum() <= 0:
+                # The day has no trips left; drop it so travel-day counts stay exact
+                del self._ordinals[i], self._buckets[i]
+                self._prefix = None
+            elif self._prefix is not None and i == len(self._ordinals) - 1:
+                self._prefix[-1] += values
+            else:
+                self._prefix = None
+        elif sign > 0:
+            self._ordinals.insert(i, ordinal)
+            self._buckets.insert(i, values)
+            if self._prefix is not None and i == len(self._ordinals) - 1:
+                self._prefix = np.concatenate([self._prefix, (self._prefix[-1] + values)[None]])
+            else:
+                self._prefix = None
+
+    def remove(self, record):
+        self.add(record, sign=-1)
+
+    # Queries
+
+    def total(self, start, end):
+        """(modes x FIELDS) array summed over start <= trip_date <= end"""
+        prefix = self._prefix_sums()
+        lo = bisect_left(self._ordinals, _ordinal(start))
+        hi = bisect_right(self._ordinals, _ordinal(end))
+        return prefix[hi] - prefix[lo] if hi > lo else np.zeros((_N_MODES, len(FIELDS)))
+
+    def travel_days(self, start, end):
+        return max(0, bisect_right(self._ordinals, _ordinal(end)) - bisect_left(self._ordinals, _ordinal(start)))
+
+    def totals(self, start, end):
+        """total_distance, total_cost, total_emission and travel_days over start..end"""
+        distance, cost, emission, _ = self.total(start, end).sum(axis=0)
+        return {
+            'total_distance': float(distance),
+            'total_cost': float(cost),
+            'total_emission': float(emission),
+            'travel_days': self.travel_days(start, end),
+        }
+
+    def mode_totals(self, start, end):
+        """{mode: {distance, cost, emission, trips}} over start..end for modes with trips"""
+        total = self.total(start, end)
+        return {
+            MODE_LABELS[code]: {
+                'distance': float(row[0]), 'cost': float(row[1]), 'emission': float(row[2]), 'trips': int(round(row[3]))
+            }
+            for code, row in enumerate(total)
+            if row[3] > 0.5
+        }
+
+    def series(self, start, end, granularity='month'):
+        """[(bucket_start, modes x FIELDS array)] for every bucket overlapping start..end, clipped to the range"""
+        start = start if isinstance(start, date) else date.fromisoformat(str(start))
+        end = end if isinstance(end, date) else date.fromisoformat(str(end))
+        rows = []
+        current = bucket_start(start, granularity)
+        while current <= end:
+            following = next_bucket(current, granularity)
+            rows.append((current, self.total(max(current, start), min(following - timedelta(days=1), end))))
+            current = following
+        return rows
+
+    def series_records(self, start, end, granularity='month'):
+        """series() flattened to chart rows: one dict per non-empty (bucket, mode)"""
+        return [
+            {'Period': period, 'Transport': MODE_LABELS[code], 'Distance': float(row[0]), 'Cost': float(row[1]),
+             'Emission': float(row[2]), 'Trips': int(round(row[3]))}
+            for period, total in self.series(start, end, granularity)
+            for code, row in enumerate(total)
+            if row[3] > 0.5
+        ]
+
+    @property
+    def first_day(self):
+        return date.fromordinal(self._ordinals[0]) if self._ordinals else None
+
+    @property
+    def last_day(self):
+        return date.fromordinal(self._ordinals[-1]) if self._ordinals else None
+
+    def _prefix_sums(self):
+        if self._prefix is None:
+            prefix = np.zeros((len(self._buckets) + 1, _N_MODES, len(FIELDS)))
+            if self._buckets:
+                np.cumsum(np.stack(self._buckets), axis=0, out=prefix[1:])
+            self._prefix = prefix
+        return self._prefix
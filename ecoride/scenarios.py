@@ -0,0 +1,101 @@
+"""What-if re-pricing of a trip history under every transport mode at once."""
+from dataclasses import dataclass
+
+import numpy as np
+
+from .factors import TRANSPORT_MODES
+from .registry import get_registry
+
+# Longest trip (km) each mode is realistically used for; other modes are unlimited
+MODE_RANGE_KM = {
+    "🚶 Walking": 5,
+    "🚲 Bicycle": 20,
+    "🛵 Electric Scooter": 60,
+}
+
+# (label, lower km exclusive, upper km inclusive) distance bands for switch summaries
+DEFAULT_BANDS = (
+    ('under 5 km', 0, 5),
+    ('5-20 km', 5, 20),
+    ('over 20 km', 20, np.inf),
+    ('all', -np.inf, np.inf),
+)
+
+_N_MODES = len(TRANSPORT_MODES)
+_RANGES = np.array([MODE_RANGE_KM.get(mode, np.inf) for mode in TRANSPORT_MODES])
+
+
+def scenario_matrix(distances):
+    """(trips x modes) cost and emission matrices: every trip priced under every mode at today's factors"""
+    distances = np.asarray(distances, dtype=np.float64)
+    cost_table, emission_table = get_registry().tables()
+    return np.multiply.outer(distances, cost_table[:_N_MODES]), np.multiply.outer(distances, emission_table[:_N_MODES])
+
+
+@dataclass
+class Switch:
+    """Effect of moving every feasible trip in a distance band to one mode"""
+    band: str
+    mode: str
+    trips: int
+    cost_saving: float
+    emission_saving: float
+
+
+class ScenarioReport:
+    """Totals and savings for a history re-priced under each mode.
+
+    mode_cost/mode_emission hold the history's totals if every trip had
+    used each mode. savings[b, m] holds (cost, emission, trips) saved by
+    switching the trips of band b that mode m can realistically cover.
+    """
+
+    def __init__(self, distances, costs, emissions, bands=DEFAULT_BANDS):
+        distances = np.asarray(distances, dtype=np.float64)
+        costs = np.asarray(costs, dtype=np.float64)
+        emissions = np.asarray(emissions, dtype=np.float64)
+        self.bands = bands
+        self.actual_cost = float(costs.sum())
+        self.actual_emission = float(emissions.sum())
+
+        cost_matrix, emission_matrix = scenario_matrix(distances)
+        self.mode_cost = cost_matrix.sum(axis=0)
+        self.mode_emission = emission_matrix.sum(axis=0)
+
+        # Trips a mode cannot cover keep their actual cost, i.e. contribute no saving
+        feasible = distances[:, None] <= _RANGES[None, :]
+        cost_saving = np.where(feasible, costs[:, None] - cost_matrix, 0.0)
+        emission_saving = np.where(feasible, emissions[:, None] - emission_matrix, 0.0)
+        band_masks = np.array([(distances > low) & (distances <= high) for _, low, high in bands], dtype=np.float64)
+
+        # One matrix product per quantity aggregates every band x mode combination
+        self.savings = np.stack([
+            band_masks @ cost_saving,
+            band_masks @ emission_saving,
+            band_masks @ feasible.astype(np.float64),
+        ], axis=-1)
+
+    def mode_rows(self):
+        """Per-mode totals for the whole history, as table rows"""
+        return [
+            {'Transport Mode': mode, 'cost': float(self.mode_cost[m]), 'emission': float(self.mode_emission[m]),
+             'cost_saving': self.actual_cost - float(self.mode_cost[m]),
+             'emission_saving': self.actual_emission - float(self.mode_emission[m])}
+            for m, mode in enumerate(TRANSPORT_MODES)
+        ]
+
+    def best_switch(self, band, by='emission'):
+        """The switch with the largest positive saving in a band, or None"""
+        b = [label for label, _, _ in self.bands].index(band)
+        column = 1 if by == 'emission' else 0
+        m = int(np.argmax(self.savings[b, :, column]))
+        if self.savings[b, m, column] <= 0:
+            return None
+        cost_saving, emission_saving, trips = self.savings[b, m]
+        return Switch(band, TRANSPORT_MODES[m], int(round(trips)), float(cost_saving), float(emission_saving))
+
+
+def report_from_rows(rows, bands=DEFAULT_BANDS):
+    """Build a ScenarioReport from (actual_distance, cost, emission) rows, e.g. from TripStore.trip_cost_chunks()"""
+    values = np.asarray(rows, dtype=np.float64).reshape(-1, 3)
+    return ScenarioReport(values[:, 0], values[:, 1], values[:, 2], bands)
@@ -0,0 +1,288 @@
+"""Persistent SQLite trip store indexed by user, date and transport mode."""
+import itertools
+import sqlite3
+import threading
+from datetime import date, timedelta
+
+from .factors import MODE_CODES, UNKNOWN_MODE
+
+DAYS_OF_WEEK = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Columns of a saved trip, in the order of the weekly_data day dicts
+TRIP_FIELDS = ('destination', 'transport_type', 'distance', 'actual_distance', 'trip_type', 'cost', 'emission')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    name TEXT PRIMARY KEY,
+    age INTEGER,
+    vehicle TEXT,
+    city TEXT
+);
+CREATE TABLE IF NOT EXISTS trips (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    trip_date TEXT NOT NULL,
+    destination TEXT,
+    transport_type TEXT NOT NULL,
+    mode_code INTEGER NOT NULL,
+    distance REAL NOT NULL,
+    actual_distance REAL NOT NULL,
+    trip_type TEXT,
+    cost REAL NOT NULL,
+    emission REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trips_user_date ON trips (user, trip_date);
+CREATE INDEX IF NOT EXISTS idx_trips_user_mode_date ON trips (user, mode_code, trip_date);
+"""
+
+
+def week_start(day=None):
+    """Return the Monday of the week containing day (default: today)"""
+    day = day or date.today()
+    return day - timedelta(days=day.weekday())
+
+
+INSERT_TRIP = (
+    "INSERT INTO trips (user, trip_date, destination, transport_type, mode_code, distance, "
+    "actual_distance, trip_type, cost, emission) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def group_by_weekday(trips):
+    """Fold date-ordered trip dicts into weekly_data.
+
+    Each day entry carries the fields of the day's latest trip; days with
+    several trips also list all of them, oldest first, under 'trips'.
+    """
+    by_day = {}
+    for trip in trips:
+        trip = dict(trip)
+        day = DAYS_OF_WEEK[date.fromisoformat(trip.pop('trip_date')).weekday()]
+        by_day.setdefault(day, []).append(trip)
+
+    weekly_data = {}
+    for day, day_trips in by_day.items():
+        weekly_data[day] = dict(day_trips[-1], traveled=True)
+        if len(day_trips) > 1:
+            weekly_data[day]['trips'] = day_trips
+    return weekly_data
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, date) else str(value)
+
+
+def _frame_rows(user, df):
+    columns = ['trip_date', 'destination', 'transport_type', 'mode_code', 'distance',
+               'actual_distance', 'trip_type', 'cost', 'emission']
+    # tolist() hands sqlite3 native Python scalars instead of NumPy ones
+    return zip(itertools.repeat(user), *(df[column].tolist() for column in columns))
+
+
+def _trip_row(user, trip):
+    return (
+        user,
+        _iso(trip['trip_date']),
+        trip.get('destination', ''),
+        trip['transport_type'],
+        MODE_CODES.get(trip['transport_type'], UNKNOWN_MODE),
+        float(trip['distance']),
+        float(trip.get('actual_distance', trip['distance'])),
+        trip.get('trip_type', 'One-way'),
+        float(trip['cost']),
+        float(trip['emission']),
+    )
+
+
+class TripStore:
+    """Trip history backed by a WAL-mode SQLite database.
+
+    One connection is shared across Streamlit sessions and guarded by a lock;
+    WAL keeps readers in other processes unblocked while a save commits.
+    """
+
+    def __init__(self, path='ecoride.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ':memory:':
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # Profiles
+
+    def save_profile(self, name, age, vehicle, city):
+        """Create or update a user's profile"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO users (name, age, vehicle, city) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET age = excluded.age, vehicle = excluded.vehicle, city = excluded.city",
+                (name, age, vehicle, city),
+            )
+
+    def load_profile(self, name):
+        """Return a user's profile dict, or None if they have never saved one"""
+        with self._lock:
+            row = self._conn.execute("SELECT name, age, vehicle, city FROM users WHERE name = ?", (name,)).fetchone()
+        return dict(row) if row else None
+
+    # Writes
+
+    def append_frame(self, user, df):
+        """Append a priced trips DataFrame (trip_date, mode_code plus TRIP_FIELDS columns)"""
+        with self._lock, self._conn:
+            self._conn.executemany(INSERT_TRIP, _frame_rows(user, df))
+        return len(df)
+
+    def replace_range(self, user, start, end, df):
+        """Replace the user's trips with start <= trip_date <= end by a priced trips DataFrame"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM trips WHERE user = ? AND trip_date BETWEEN ? AND ?",
+                               (user, _iso(start), _iso(end)))
+            self._conn.executemany(INSERT_TRIP, _frame_rows(user, df))
+        return len(df)
+
+    def add_trip(self, user, trip_date, trip):
+        """Record one more trip on a day, after the ones already saved"""
+        row = _trip_row(user, dict(trip, trip_date=trip_date))
+        with self._lock, self._conn:
+            self._conn.execute(INSERT_TRIP, row)
+
+    def replace_trip(self, user, trip_date, index, trip):
+        """Overwrite the index-th trip (oldest first) saved on a day; returns whether it existed"""
+        row = _trip_row(user, dict(trip, trip_date=trip_date))
+        with self._lock, self._conn:
+            found = self._conn.execute(
+                "SELECT id FROM trips WHERE user = ? AND trip_date = ? ORDER BY id LIMIT 1 OFFSET ?",
+                (user, _iso(trip_date), index),
+            ).fetchone()
+            if found is None:
+                return False
+            self._conn.execute(
+                "UPDATE trips SET destination = ?, transport_type = ?, mode_code = ?, distance = ?, "
+                "actual_distance = ?, trip_type = ?, cost = ?, emission = ? WHERE id = ?",
+                (*row[2:], found[0]),
+            )
+        return True
+
+    def delete_day(self, user, trip_date):
+        """Remove every trip recorded for one day"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM trips WHERE user = ? AND trip_date = ?", (user, _iso(trip_date)))
+
+    def update_prices(self, rows):
+        """Overwrite cost and emission for (cost, emission, id) rows in a single transaction"""
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE trips SET cost = ?, emission = ? WHERE id = ?", rows)
+
+    # Reads
+
+    def trips_between(self, user, start, end):
+        """Return the user's trips with start <= trip_date <= end, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT trip_date, " + ", ".join(TRIP_FIELDS) + " FROM trips "
+                "WHERE user = ? AND trip_date BETWEEN ? AND ? ORDER BY trip_date, id",
+                (user, _iso(start), _iso(end)),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def daily_mode_totals(self, user):
+        """(trip_date, mode_code, distance, cost, emission, trips) per day and mode over the user's history"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT trip_date, mode_code, SUM(actual_distance), SUM(cost), SUM(emission), COUNT(*) FROM trips "
+                "WHERE user = ? GROUP BY trip_date, mode_code ORDER BY trip_date",
+                (user,),
+            ).fetchall()
+
+    def destination_history(self, user):
+        """(destination, trip_date, trips) for every day the user travelled to each destination"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT destination, trip_date, COUNT(*) FROM trips WHERE user = ? GROUP BY destination, trip_date",
+                (user,),
+            ).fetchall()
+
+    def trip_cost_chunks(self, user, chunksize=50_000):
+        """Yield lists of (actual_distance, cost, emission) rows covering the user's history.
+
+        Pages by (trip_date, id) like trip_chunks, so the lock is released
+        between chunks and saves from other sessions are not held up.
+        """
+        after = ('', -1)
+        while True:
+            with self._lock:
+                cursor = self._conn.cursor()
+                cursor.row_factory = None
+                rows = cursor.execute(
+                    "SELECT actual_distance, cost, emission, trip_date, id FROM trips "
+                    "WHERE user = ? AND (trip_date, id) > (?, ?) ORDER BY trip_date, id LIMIT ?",
+                    (user, *after, chunksize),
+                ).fetchall()
+            if not rows:
+                return
+            after = rows[-1][3:]
+            yield [row[:3] for row in rows]
+
+    def user_totals(self, user=None):
+        """(user, city, distance, cost, emission, trips, last trip_date) per user, least recently active first.
+
+        user=None covers every user with trips; users without a profile get city ''.
+        """
+        user_filter = "" if user is None else "WHERE t.user = ? "
+        with self._lock:
+            return self._conn.execute(
+                "SELECT t.user, COALESCE(u.city, ''), SUM(t.actual_distance), SUM(t.cost), SUM(t.emission), "
+                "COUNT(*), MAX(t.trip_date) FROM trips t LEFT JOIN users u ON u.name = t.user "
+                f"{user_filter}GROUP BY t.user ORDER BY MAX(t.trip_date)",
+                () if user is None else (user,),
+            ).fetchall()
+
+    def trip_chunks(self, user, chunksize=50_000):
+        """Yield lists of (trip_date, *TRIP_FIELDS) rows covering the user's history in date order.
+
+        Pages by (trip_date, id) on the user/date index, so each chunk is one
+        bounded query and memory stays flat however long the history is.
+        """
+        after = ('', -1)
+        while True:
+            with self._lock:
+                cursor = self._conn.cursor()
+                # Plain tuples: sqlite3.Row costs more than the query for wide exports
+                cursor.row_factory = None
+                rows = cursor.execute(
+                    f"SELECT trip_date, {', '.join(TRIP_FIELDS)}, id FROM trips "
+                    "WHERE user = ? AND (trip_date, id) > (?, ?) ORDER BY trip_date, id LIMIT ?",
+                    (user, *after, chunksize),
+                ).fetchall()
+            if not rows:
+                return
+            after = (rows[-1][0], rows[-1][-1])
+            yield [row[:-1] for row in rows]
+
+    def pricing_chunks(self, user=None, chunksize=50_000):
+        """Yield lists of (id, trip_date, mode_code, actual_distance, cost, emission) rows in id order.
+
+        Pages by id so the lock is released between chunks and rows updated
+        in the meantime are not revisited; user=None walks every user's trips.
+        """
+        last_id = -1
+        user_filter = "" if user is None else "AND user = ? "
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, trip_date, mode_code, actual_distance, cost, emission FROM trips "
+                    f"WHERE id > ? {user_filter}ORDER BY id LIMIT ?",
+                    (last_id, *(() if user is None else (user,)), chunksize),
+                ).fetchall()
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1][0]
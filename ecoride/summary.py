@@ -0,0 +1,22 @@
+"""Transport mode analysis table for the weekly summary."""
+import pandas as pd
+
+TRANSPORT_TABLE_FORMAT = {
+    'distance': '{:.1f} km',
+    'cost': '₹{:.2f}',
+    'emission': '{:.0f}g',
+    'trips': '{:.0f}'
+}
+
+
+def transport_table(aggregate):
+    """One row per transport mode with its distance, cost, emission and trip count"""
+    transport_df = pd.DataFrame.from_dict(aggregate.transport_usage, orient='index')
+    transport_df.reset_index(inplace=True)
+    transport_df.rename(columns={'index': 'Transport Mode'}, inplace=True)
+    return transport_df
+
+
+def style_transport_table(transport_df):
+    """Styler with units on every numeric column"""
+    return transport_df.style.format(TRANSPORT_TABLE_FORMAT)
@@ -0,0 +1,164 @@
+"""Compact array-backed trip container for session state and long histories."""
+from array import array
+from datetime import date
+
+from .factors import MODE_CODES, TRANSPORT_MODES
+from .store import DAYS_OF_WEEK, group_by_weekday
+
+TRIP_TYPES = ('One-way', 'Round-trip')
+_TRIP_TYPE_CODES = {trip_type: code for code, trip_type in enumerate(TRIP_TYPES)}
+
+
+class TripTable:
+    """Trips stored column-wise in typed arrays.
+
+    Dates are kept as proleptic ordinals (int32), transport modes and trip
+    types as one-byte codes, destinations as uint32 indexes into a table of
+    interned strings, and distance/cost/emission as float64. Known transport
+    modes use their MODE_CODES value, so the mode column can be handed
+    straight to the emissions engine. A trip costs about 34 bytes, against
+    roughly 430 for the equivalent weekly_data dict.
+    """
+
+    __slots__ = ('ordinals', 'modes', 'trip_types', 'destination_codes', 'distance', 'cost', 'emission',
+                 'mode_labels', 'destinations', '_destination_index')
+
+    def __init__(self):
+        self.ordinals = array('i')
+        self.modes = array('B')
+        self.trip_types = array('B')
+        self.destination_codes = array('I')
+        self.distance = array('d')
+        self.cost = array('d')
+        self.emission = array('d')
+        self.mode_labels = list(TRANSPORT_MODES)
+        self.destinations = []
+        self._destination_index = {}
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the column buffers (interned strings excluded)"""
+        columns = (self.ordinals, self.modes, self.trip_types, self.destination_codes,
+                   self.distance, self.cost, self.emission)
+        return sum(column.itemsize * len(column) for column in columns)
+
+    # Conversion
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a table from trip dicts with 'trip_date' plus TRIP_FIELDS"""
+        table = cls()
+        for record in records:
+            table.append(record)
+        return table
+
+    @classmethod
+    def from_weekly_data(cls, weekly_data, monday):
+        """Build a table from a weekly_data dict for the week starting on monday"""
+        table = cls()
+        for day, record in weekly_data.items():
+            if record.get('traveled', False):
+                trip_date = date.fromordinal(monday.toordinal() + DAYS_OF_WEEK.index(day))
+                for trip in record.get('trips', [record]):
+                    table.append(dict(trip, trip_date=trip_date))
+        return table
+
+    def record(self, i):
+        """Return trip i as a dict with an ISO 'trip_date' plus TRIP_FIELDS"""
+        distance = self.distance[i]
+        trip_type = TRIP_TYPES[self.trip_types[i]]
+        return {
+            'trip_date': date.fromordinal(self.ordinals[i]).isoformat(),
+            'destination': self.destinations[self.destination_codes[i]],
+            'transport_type': self.mode_labels[self.modes[i]],
+            'distance': distance,
+            'actual_distance': distance * (2 if trip_type == 'Round-trip' else 1),
+            'trip_type': trip_type,
+            'cost': self.cost[i],
+            'emission': self.emission[i],
+        }
+
+    def to_records(self):
+        return [self.record(i) for i in range(len(self))]
+
+    def to_weekly_data(self):
+        """Return the weekly_data/report shape, keyed by weekday name"""
+        return group_by_weekday(sorted(self.to_records(), key=lambda record: record['trip_date']))
+
+    # Mutation
+
+    def append(self, record):
+        """Append one trip dict with 'trip_date' plus TRIP_FIELDS"""
+        trip_date = record['trip_date']
+        if not isinstance(trip_date, date):
+            trip_date = date.fromisoformat(str(trip_date))
+        self.ordinals.append(trip_date.toordinal())
+        self.modes.append(self._mode_code(record['transport_type']))
+        self.trip_types.append(_TRIP_TYPE_CODES.get(record.get('trip_type', 'One-way'), 0))
+        self.destination_codes.append(self._destination_code(record.get('destination', '')))
+        self.distance.append(float(record['distance']))
+        self.cost.append(float(record['cost']))
+        self.emission.append(float(record['emission']))
+
+    def day_indexes(self, trip_date):
+        """Indexes of the trips recorded on trip_date, oldest first"""
+        ordinal = trip_date.toordinal()
+        return [i for i, value in enumerate(self.ordinals) if value == ordinal]
+
+    def day_records(self, trip_date):
+        """Every trip on trip_date as weekly_data day dicts, oldest first"""
+        records = []
+        for i in self.day_indexes(trip_date):
+            record = self.record(i)
+            del record['trip_date']
+            records.append(dict(record, traveled=True))
+        return records
+
+    def day_record(self, trip_date):
+        """The latest trip on trip_date in weekly_data day shape, or None"""
+        records = self.day_records(trip_date)
+        return records[-1] if records else None
+
+    def delete_day(self, trip_date):
+        """Remove every trip on trip_date; returns whether anything was removed"""
+        indexes = self.day_indexes(trip_date)
+        for i in reversed(indexes):
+            for column in (self.ordinals, self.modes, self.trip_types, self.destination_codes,
+                           self.distance, self.cost, self.emission):
+                del column[i]
+        return bool(indexes)
+
+    def extend(self, records):
+        """Append several trip dicts with 'trip_date' plus TRIP_FIELDS"""
+        for record in records:
+            self.append(record)
+
+    def replace_trip(self, trip_date, index, record):
+        """Overwrite the index-th trip (oldest first) on trip_date with a trip dict"""
+        i = self.day_indexes(trip_date)[index]
+        trip_type = record.get('trip_type', 'One-way')
+        self.modes[i] = self._mode_code(record['transport_type'])
+        self.trip_types[i] = _TRIP_TYPE_CODES.get(trip_type, 0)
+        self.destination_codes[i] = self._destination_code(record.get('destination', ''))
+        self.distance[i] = float(record['distance'])
+        self.cost[i] = float(record['cost'])
+        self.emission[i] = float(record['emission'])
+
+    def _mode_code(self, label):
+        code = MODE_CODES.get(label)
+        if code is None:
+            # Unknown labels are interned past the known modes; the engine prices them with the fallback factors
+            if label not in self.mode_labels:
+                self.mode_labels.append(label)
+            code = self.mode_labels.index(label)
+        return code
+
+    def _destination_code(self, destination):
+        code = self._destination_index.get(destination)
+        if code is None:
+            code = self._destination_index[destination] = len(self.destinations)
+            self.destinations.append(destination)
+        return code
@@ -0,0 +1,95 @@
+"""RunningAggregate against a full recompute after random sequences of edits."""
+import math
+import random
+
+import pytest
+
+from ecoride import TRANSPORT_MODES
+from ecoride.aggregates import RunningAggregate
+from ecoride.store import DAYS_OF_WEEK
+
+
+def _trip(rng):
+    distance = round(rng.uniform(0.5, 80), 1)
+    return {
+        'traveled': True,
+        'destination': rng.choice(['Office', 'Market', 'Gym', 'Airport']),
+        'transport_type': rng.choice(list(TRANSPORT_MODES)),
+        'distance': distance,
+        'actual_distance': distance * rng.choice([1, 2]),
+        'cost': round(rng.uniform(0, 500), 2),
+        'emission': round(rng.uniform(0, 20_000), 1),
+    }
+
+
+def _weekly_data(week):
+    """weekly_data for day -> [trips], as the store builds it"""
+    weekly_data = {}
+    for day, trips in week.items():
+        if trips:
+            weekly_data[day] = dict(trips[-1], traveled=True)
+            if len(trips) > 1:
+                weekly_data[day]['trips'] = trips
+    return weekly_data
+
+
+def _assert_matches(aggregate, expected):
+    assert aggregate.travel_days == expected.travel_days
+    for field in ('total_distance', 'total_cost', 'total_emission'):
+        assert math.isclose(getattr(aggregate, field), getattr(expected, field), rel_tol=1e-9, abs_tol=1e-6), field
+    assert aggregate.transport_usage.keys() == expected.transport_usage.keys()
+    for mode, usage in expected.transport_usage.items():
+        assert aggregate.transport_usage[mode]['trips'] == usage['trips'], mode
+        for field in ('distance', 'cost', 'emission'):
+            assert math.isclose(aggregate.transport_usage[mode][field], usage[field],
+                                rel_tol=1e-9, abs_tol=1e-6), (mode, field)
+
+
+@pytest.mark.parametrize('seed', range(25))
+def test_random_edits_match_full_recompute(seed):
+    rng = random.Random(seed)
+    aggregate = RunningAggregate()
+    week = {}
+    for _ in range(200):
+        day = rng.choice(DAYS_OF_WEEK)
+        op = rng.choice(['save', 'add', 'replace', 'delete', 'clear'])
+        if op == 'replace' and not week.get(day):
+            op = 'add'
+        version = aggregate.version
+        if op == 'save':
+            trip = _trip(rng)
+            aggregate.save(day, trip)
+            week[day] = [trip]
+        elif op == 'add':
+            trip = _trip(rng)
+            aggregate.add(day, trip)
+            week.setdefault(day, []).append(trip)
+        elif op == 'replace':
+            index = rng.randrange(len(week[day]))
+            trip = _trip(rng)
+            aggregate.replace(day, index, trip)
+            week[day][index] = trip
+        elif op == 'delete':
+            had_trips = bool(week.get(day))
+            aggregate.delete(day)
+            week.pop(day, None)
+            assert (aggregate.version != version) == had_trips
+        else:
+            # A record with traveled=False clears the day
+            aggregate.save(day, {'traveled': False})
+            week.pop(day, None)
+        if op != 'delete':
+            assert aggregate.version != version
+        _assert_matches(aggregate, RunningAggregate.from_weekly_data(_weekly_data(week)))
+
+
+def test_deleting_every_day_resets_totals():
+    rng = random.Random(0)
+    aggregate = RunningAggregate()
+    for day in DAYS_OF_WEEK:
+        aggregate.add(day, _trip(rng))
+        aggregate.add(day, _trip(rng))
+    for day in DAYS_OF_WEEK:
+        aggregate.delete(day)
+    assert aggregate.totals() == {'total_distance': 0.0, 'total_cost': 0.0, 'total_emission': 0.0, 'travel_days': 0}
+    assert aggregate.transport_usage == {}
@@ -0,0 +1,34 @@
+"""DestinationIndex completions as trips are added and removed."""
+from datetime import date
+
+from ecoride.autocomplete import DestinationIndex
+
+
+def test_removing_a_recent_trip_keeps_older_trips():
+    index = DestinationIndex()
+    index.add('Goa', date(2016, 1, 1))
+    index.add('Goa', date(2026, 1, 1))
+    index.remove('Goa', date(2026, 1, 1))
+    assert index.complete('go') == ['Goa']
+    index.remove('Goa', date(2016, 1, 1))
+    assert index.complete('go') == []
+    assert len(index) == 0
+
+
+def test_incremental_updates_match_a_rebuild():
+    rows = [('Office', '2026-01-05', 3), ('Old Market', '2018-03-01', 5), ('Olive Cafe', '2025-12-30', 1)]
+    index = DestinationIndex.from_history(rows)
+    index.add('Office', '2026-01-06')
+    index.remove('Old Market', '2018-03-01', 2)
+    expected = DestinationIndex.from_history(
+        [('Office', '2026-01-05', 3), ('Office', '2026-01-06', 1), ('Old Market', '2018-03-01', 3),
+         ('Olive Cafe', '2025-12-30', 1)])
+    assert index.complete('o') == expected.complete('o')
+    assert index.counts == expected.counts
+
+
+def test_far_future_dates_do_not_overflow():
+    index = DestinationIndex.from_history([('Goa', '2255-01-01', 1), ('Gokarna', '2262-04-11', 2)])
+    assert index.complete('go') == ['Gokarna', 'Goa']
+    index.remove('Gokarna', '2262-04-11', 2)
+    assert index.complete('go') == ['Goa']
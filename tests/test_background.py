@@ -0,0 +1,48 @@
+"""AnalyticsPool snapshot keying, cancellation and eviction."""
+import threading
+
+import pytest
+
+from ecoride.background import AnalyticsPool, Cancelled
+
+
+@pytest.fixture
+def pool():
+    pool = AnalyticsPool(workers=3, max_jobs=2)
+    yield pool
+    pool.shutdown()
+
+
+def _blocking(release):
+    def build(job, value):
+        while not release.wait(0.01):
+            job.check()
+        return value
+    return build
+
+
+def test_same_version_reuses_the_job(pool):
+    job = pool.submit('a', 1, lambda job, value: value, 'x')
+    assert pool.submit('a', 1, lambda job, value: value, 'y') is job
+    assert job.result(5) == 'x'
+
+
+def test_newer_snapshot_cancels_the_running_job(pool):
+    release = threading.Event()
+    old = pool.submit('a', 1, _blocking(release), 'old')
+    new = pool.submit('a', 2, lambda job, value: value, 'new')
+    assert new.result(5) == 'new'
+    with pytest.raises(Cancelled):
+        old.future.result(5)
+
+
+def test_eviction_keeps_running_jobs(pool):
+    release = threading.Event()
+    running = [pool.submit(key, 1, _blocking(release), key) for key in ('a', 'b')]
+    pool.submit('c', 1, lambda job, value: value, 'c').result(5)
+    assert not any(job.cancelled for job in running)
+    release.set()
+    assert [job.result(5) for job in running] == ['a', 'b']
+    # Once finished, the least recently used jobs are forgotten
+    pool.submit('d', 1, lambda job, value: value, 'd').result(5)
+    assert len(pool) == 2
@@ -0,0 +1,39 @@
+"""Gazetteer lookups, distances and nearest-place search."""
+import numpy as np
+
+from ecoride.gazetteer import Gazetteer, haversine_km, load_gazetteer
+
+
+def _random_places(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lats = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    lons = rng.uniform(-180, 180, n)
+    return Gazetteer([f"Place {i}" for i in range(n)], lats, lons)
+
+
+def test_nearest_matches_brute_force():
+    gazetteer = _random_places(5_000)
+    rng = np.random.default_rng(1)
+    # Includes queries either side of the antimeridian and near the poles
+    queries = [(0.0, 179.9), (0.0, -179.9), (89.5, 10.0), (-89.5, -170.0)]
+    queries += list(zip(rng.uniform(-90, 90, 50), rng.uniform(-180, 180, 50)))
+    for lat, lon in queries:
+        distances = haversine_km(lat, lon, gazetteer.lats, gazetteer.lons)
+        expected = [gazetteer.names[i] for i in np.argsort(distances)[:3]]
+        assert [name for name, _ in gazetteer.nearest(lat, lon, k=3)] == expected
+
+
+def test_near_excludes_the_place_itself():
+    gazetteer = load_gazetteer()
+    nearby = gazetteer.near('Pune', k=3)
+    assert len(nearby) == 3
+    assert all(name != 'Pune' for name, _ in nearby)
+    assert [km for _, km in nearby] == sorted(km for _, km in nearby)
+    assert gazetteer.near('Nowhere Town') == []
+
+
+def test_distance_between_known_places():
+    gazetteer = load_gazetteer()
+    assert 115 < gazetteer.distance_km('pune, Maharashtra', 'Bombay') < 125
+    assert gazetteer.distance_km('Pune', 'Nowhere Town') is None
+    assert np.isnan(gazetteer.distances_km('Pune', ['Mumbai', 'Nowhere Town'])).tolist() == [False, True]
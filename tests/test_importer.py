@@ -0,0 +1,27 @@
+"""Validation in prepare_chunk."""
+import pandas as pd
+
+from ecoride.importer import prepare_chunk
+
+
+def test_non_finite_and_negative_distances_are_rejected():
+    chunk = pd.DataFrame({
+        'trip_date': ['2026-01-01'] * 5,
+        'transport_type': ['🚌 Bus'] * 5,
+        'distance': [12.5, float('inf'), '-inf', 'nan', -1],
+    })
+    priced, rejected = prepare_chunk(chunk)
+    assert rejected == 4
+    assert priced['distance'].tolist() == [12.5]
+    assert priced[['cost', 'emission']].notna().all().all()
+
+
+def test_far_future_dates_are_rejected():
+    chunk = pd.DataFrame({
+        'trip_date': ['2026-01-01', '2255-01-01', '2262-04-11'],
+        'transport_type': ['🚌 Bus'] * 3,
+        'distance': [5.0] * 3,
+    })
+    priced, rejected = prepare_chunk(chunk)
+    assert rejected == 2
+    assert priced['trip_date'].tolist() == ['2026-01-01']
@@ -0,0 +1,20 @@
+"""Profiler statistics and Prometheus export."""
+from ecoride.profiling import Profiler
+
+
+def _exported(profiler, series):
+    for line in profiler.to_prometheus().splitlines():
+        if line.startswith(f'ecoride_section_seconds_{series}{{section="rerun"}}'):
+            return float(line.rsplit(' ', 1)[1])
+    raise AssertionError(f"{series} not exported")
+
+
+def test_summary_sum_is_the_exact_lifetime_total():
+    profiler = Profiler(enabled=True, window=2)
+    for seconds in (1.0, 1.0, 0.1, 0.1):
+        profiler.record('rerun', seconds)
+    # Faster samples rolling the slow ones out of the window must not shrink the total
+    assert _exported(profiler, 'sum') == 2.2
+    assert _exported(profiler, 'count') == 4
+    profiler.record('rerun', 0.1)
+    assert _exported(profiler, 'sum') == 2.3
@@ -0,0 +1,32 @@
+"""Date-aware pricing in FactorRegistry."""
+from datetime import date, timedelta
+
+import numpy as np
+
+from ecoride.factors import TRANSPORT_MODES
+from ecoride.registry import FactorRegistry
+
+
+def _registry():
+    today = date.today()
+    emission = {mode: 100.0 for mode in TRANSPORT_MODES}
+    cost = {mode: 1.0 for mode in TRANSPORT_MODES}
+    periods = [
+        (date(2000, 1, 1), emission, cost),
+        (today - timedelta(days=30), emission, {mode: 2.0 for mode in TRANSPORT_MODES}),
+        (today + timedelta(days=365), emission, {mode: 3.0 for mode in TRANSPORT_MODES}),
+    ]
+    return FactorRegistry({'version': 'test', 'fallback': {'emission': 75.0, 'cost': 3.5}, 'periods': periods})
+
+
+def test_trips_price_with_their_own_period():
+    registry = _registry()
+    cost, _ = registry.price(np.array([10.0, 10.0]), np.array([0, 0]), np.array(['2010-06-01', date.today()]))
+    assert cost.tolist() == [10.0, 20.0]
+
+
+def test_missing_dates_price_with_todays_period():
+    registry = _registry()
+    trip_dates = np.array(['2010-06-01', 'NaT', 'NaT'], dtype='datetime64[ns]')
+    cost, _ = registry.price(np.array([10.0, 10.0, 5.0]), np.array([0, 0, 0]), trip_dates)
+    assert cost.tolist() == [10.0, 20.0, 10.0]
@@ -0,0 +1,28 @@
+"""Bulk weekly reports across a process pool."""
+from ecoride.reports import generate_reports, main
+from ecoride.store import week_start
+
+
+def _logs(tmp_path):
+    monday = week_start().isoformat()
+    for name in ('asha', 'ben', 'chen'):
+        (tmp_path / f'{name}.csv').write_text(f"trip_date,transport_type,distance\n{monday},🚌 Bus,5\n",
+                                              encoding='utf-8')
+    # Missing the required distance column
+    (tmp_path / 'broken.csv').write_text(f"trip_date,transport_type\n{monday},🚌 Bus\n", encoding='utf-8')
+    (tmp_path / 'garbled.parquet').write_bytes(b'not a parquet file')
+
+
+def test_bad_logs_are_reported_without_stopping_the_run(tmp_path):
+    _logs(tmp_path)
+    results = {name: (days, error) for name, days, error in generate_reports(tmp_path, tmp_path / 'out', workers=2)}
+    assert {name: days for name, (days, error) in results.items() if error is None} == {'asha': 1, 'ben': 1, 'chen': 1}
+    assert {name for name, (days, error) in results.items() if error is not None} == {'broken', 'garbled'}
+    assert sorted(path.name for path in (tmp_path / 'out').iterdir()) == [
+        'asha_travel_report.json', 'ben_travel_report.json', 'chen_travel_report.json']
+
+
+def test_main_exits_non_zero_on_failures(tmp_path, capsys):
+    _logs(tmp_path)
+    assert main([str(tmp_path), str(tmp_path / 'out'), '--workers', '2']) == 1
+    assert '2 report(s) failed' in capsys.readouterr().err
@@ -0,0 +1,30 @@
+"""Per-trip writes in TripStore and TripTable."""
+from datetime import date
+
+from ecoride.store import TripStore
+from ecoride.trips import TripTable
+
+DAY = date(2026, 1, 5)
+
+
+def _trip(destination, distance):
+    return {'destination': destination, 'transport_type': '🚌 Bus', 'distance': distance,
+            'actual_distance': distance, 'trip_type': 'One-way', 'cost': distance, 'emission': distance * 10}
+
+
+def test_add_and_replace_touch_only_one_trip():
+    store = TripStore(':memory:')
+    store.add_trip('asha', DAY, _trip('Office', 12.0))
+    store.add_trip('asha', DAY, _trip('Gym', 3.0))
+    store.add_trip('ben', DAY, _trip('Office', 7.0))
+    assert store.replace_trip('asha', DAY, 0, _trip('Airport', 30.0))
+    assert not store.replace_trip('asha', DAY, 2, _trip('Nowhere', 1.0))
+
+    trips = store.trips_between('asha', DAY, DAY)
+    assert [(trip['destination'], trip['distance']) for trip in trips] == [('Airport', 30.0), ('Gym', 3.0)]
+    assert len(store.trips_between('ben', DAY, DAY)) == 1
+
+    # The session's table mirrors the same edit in the same order
+    table = TripTable.from_records([dict(_trip('Office', 12.0), trip_date=DAY), dict(_trip('Gym', 3.0), trip_date=DAY)])
+    table.replace_trip(DAY, 0, _trip('Airport', 30.0))
+    assert [dict(record, trip_date=DAY.isoformat()) for record in trips] == table.to_records()
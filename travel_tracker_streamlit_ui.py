@@ -1,9 +1,19 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import timedelta
+import copy
 import json
+import os
+import tempfile
+import time
+import uuid
+
+# pandas, NumPy and Plotly are imported inside the functions that need them so
+# the profile setup screen renders without loading them
+from ecoride import TRANSPORT_MODES
+from ecoride.aggregates import RunningAggregate
+from ecoride.profiling import Profiler
+from ecoride.store import DAYS_OF_WEEK, TripStore, week_start
+from ecoride.trips import TripTable
 
 # Page configuration
 st.set_page_config(
@@ -69,57 +79,98 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Function to calculate emissions based on transport type
-def calculate_emissions_and_cost(distance, transport_type):
-    """Calculate cost and emissions based on transport type and distance"""
-    
-    # Emission factors (grams CO2 per km)
-    emission_factors = {
-        "🏍️ Motorcycle/Scooter": 80,
-        "🚗 Car (Petrol)": 120,
-        "🚗 Car (Diesel)": 100,
-        "🚌 Bus": 40,
-        "🚆 Train": 30,
-        "🚕 Auto Rickshaw": 90,
-        "🚲 Bicycle": 0,
-        "🚶 Walking": 0,
-        "✈️ Flight (Domestic)": 200,
-        "🛵 Electric Scooter": 20
-    }
-    
-    # Cost factors (rupees per km)
-    cost_factors = {
-        "🏍️ Motorcycle/Scooter": 3.5,
-        "🚗 Car (Petrol)": 6.0,
-        "🚗 Car (Diesel)": 4.5,
-        "🚌 Bus": 2.0,
-        "🚆 Train": 1.5,
-        "🚕 Auto Rickshaw": 12.0,
-        "🚲 Bicycle": 0,
-        "🚶 Walking": 0,
-        "✈️ Flight (Domestic)": 8.0,
-        "🛵 Electric Scooter": 0.5
-    }
+@st.cache_resource
+def get_trip_store():
+    """Open the trip store once per server process"""
+    return TripStore(os.environ.get('ECORIDE_DB', 'ecoride.db'))
+
+trip_store = get_trip_store()
+
+@st.cache_resource
+def get_profiler():
+    """Section timings shared by all sessions; enabled with ECORIDE_PROFILE=1"""
+    return Profiler.from_env()
+
+profiler = get_profiler()
+
+@st.cache_resource
+def get_figure_cache():
+    """Built Plotly figures shared by all sessions, keyed by a hash of the charted data"""
+    from ecoride.charts import FigureCache
+    return FigureCache()
+
+@st.cache_resource
+def get_leaderboard():
+    """User and city totals shared by all sessions; built once, then updated by every save"""
+    from ecoride.leaderboard import Leaderboard
+    return Leaderboard.from_store(get_trip_store())
+
+@st.cache_resource
+def get_analytics_pool():
+    """Worker threads that build every session's analytics off the script thread"""
+    from ecoride.background import AnalyticsPool
+    return AnalyticsPool()
+
+# Seconds a rerun waits for fresh analytics before showing a placeholder, and how often the placeholder polls
+ANALYTICS_WAIT = 0.1
+ANALYTICS_POLL = 0.5
+
+# Longest history offered as an in-app download; longer ones are pointed at python -m ecoride.exports
+MAX_DOWNLOAD_TRIPS = 500_000
+rerun_started = time.perf_counter()
 
-    emission = distance * emission_factors.get(transport_type, 75)
-    cost = distance * cost_factors.get(transport_type, 3.5)
-    
-    # ✅ Return values properly
-    return cost, emission
-    
 # Initialize session state
 if 'user_data' not in st.session_state:
     st.session_state.user_data = {
         'name': '',
         'age': 0,
         'vehicle': '',
-        'city': '',
-        'weekly_data': {}
+        'city': ''
     }
 
+# The current week's trips live in a compact TripTable rather than per-day dicts
+if 'week_trips' not in st.session_state:
+    st.session_state.week_trips = TripTable()
+
+if 'weekly_aggregate' not in st.session_state:
+    st.session_state.weekly_aggregate = RunningAggregate()
+
 if 'current_step' not in st.session_state:
     st.session_state.current_step = 'setup'
 
+# Keys this session's jobs in the process-wide analytics pool
+if 'analytics_owner' not in st.session_state:
+    st.session_state.analytics_owner = uuid.uuid4().hex
+
+# Day tabs cover the current calendar week
+current_week = week_start()
+
+# Keyed widgets of each day tab; their values outlive a reload of the week unless cleared
+DAY_WIDGET_KEYS = ('travel_', 'trip_pick_', 'dest_', 'dest_pick_', 'near_pick_', 'transport_', 'dist_', 'trip_')
+# Day-tab form fields, refilled whenever a different trip is picked for editing
+TRIP_FORM_KEYS = ('dest_', 'transport_', 'dist_', 'trip_')
+
+def load_trip_history(name):
+    """Load a user's week of trips, long-range rollups and destination history from the trip store"""
+    from ecoride.autocomplete import DestinationIndex
+    from ecoride.rollups import RollupIndex
+
+    # Day tabs re-read the new week instead of keeping the previous week's widget values
+    for day in DAYS_OF_WEEK:
+        for prefix in DAY_WIDGET_KEYS:
+            st.session_state.pop(f"{prefix}{day}", None)
+
+    trips = trip_store.trips_between(name, current_week, current_week + timedelta(days=6))
+    st.session_state.loaded_week = current_week
+    st.session_state.week_trips = TripTable.from_records(trips)
+    st.session_state.weekly_aggregate = RunningAggregate.from_records(trips)
+    st.session_state.rollups = RollupIndex.from_daily_totals(trip_store.daily_mode_totals(name))
+    st.session_state.destinations = DestinationIndex.from_history(trip_store.destination_history(name))
+
+# A session left open past Sunday night moves on to the new week before anything renders
+if st.session_state.current_step == 'tracking' and st.session_state.get('loaded_week') != current_week:
+    load_trip_history(st.session_state.user_data['name'])
+
 # Header
 st.markdown("""
 <div class="main-header">
@@ -129,7 +180,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Sidebar for user information
-with st.sidebar:
+with st.sidebar, profiler.section('sidebar'):
     st.header("👤 User Profile")
     
     if st.session_state.current_step == 'setup':
@@ -166,6 +217,9 @@ with st.sidebar:
                     'vehicle': vehicle,
                     'city': city
                 })
+                get_leaderboard().set_city(name, city)
+                trip_store.save_profile(name, age, vehicle, city)
+                load_trip_history(name)
                 st.session_state.current_step = 'tracking'
                 st.rerun()
             else:
@@ -182,6 +236,694 @@ with st.sidebar:
             st.session_state.current_step = 'setup'
             st.rerun()
 
+def autofill_distance(day):
+    """Fill a day's distance from the offline gazetteer when its destination is a known place"""
+    from ecoride.gazetteer import load_gazetteer
+
+    km = load_gazetteer().distance_km(st.session_state.user_data['city'], st.session_state[f"dest_{day}"])
+    if km is not None:
+        st.session_state[f"dist_{day}"] = round(km, 1)
+
+def pick_destination(day, source='dest_pick'):
+    """Copy a clicked destination suggestion (recent or nearby place) into the day's destination field"""
+    picked = st.session_state[f"{source}_{day}"]
+    st.session_state[f"{source}_{day}"] = None
+    if picked:
+        st.session_state[f"dest_{day}"] = picked
+        autofill_distance(day)
+
+# Trip picker value for adding a trip rather than editing one of the day's trips
+NEW_TRIP = -1
+
+def fill_trip_form(day, trip):
+    """Seed a day's form fields from a saved trip, or with blanks for a new one"""
+    st.session_state[f"dest_{day}"] = trip.get('destination', '')
+    st.session_state[f"transport_{day}"] = trip.get('transport_type', TRANSPORT_MODES[0])
+    st.session_state[f"dist_{day}"] = float(trip.get('distance', 0))
+    st.session_state[f"trip_{day}"] = trip.get('trip_type', 'One-way')
+
+def pick_trip(day, day_trips):
+    """Load the trip picked for editing into the day's form"""
+    pick = st.session_state[f"trip_pick_{day}"]
+    fill_trip_form(day, day_trips[pick] if pick != NEW_TRIP else {})
+
+# Each day tab and the summary run as fragments: widget changes rerun only
+# their own fragment, and a save/delete reruns the app so the summary updates
+@st.fragment
+def render_day_tab(day, day_date):
+    """Render one day's travel log; reruns on its own when its widgets change"""
+    from ecoride.emissions import calculate_emissions_and_cost
+    from ecoride.gazetteer import load_gazetteer
+
+    day_trips = st.session_state.week_trips.day_records(day_date)
+    day_data = day_trips[-1] if day_trips else {}
+
+    # Edit the latest trip by default; a save selects the trip it wrote, applied before the picker exists
+    trip_options = [NEW_TRIP, *range(len(day_trips))]
+    if f"next_trip_pick_{day}" in st.session_state:
+        st.session_state[f"trip_pick_{day}"] = st.session_state.pop(f"next_trip_pick_{day}")
+    if st.session_state.get(f"trip_pick_{day}") not in trip_options:
+        st.session_state[f"trip_pick_{day}"] = len(day_trips) - 1 if day_trips else NEW_TRIP
+        for prefix in TRIP_FORM_KEYS:
+            st.session_state.pop(f"{prefix}{day}", None)
+
+    st.subheader(f"🌟 {day} Travel Log")
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        traveled = st.radio(
+            f"Did you travel on {day}?",
+            ["No", "Yes"],
+            key=f"travel_{day}",
+            index=1 if day_data.get('traveled', False) else 0
+        )
+
+        if traveled == "Yes":
+            pick = st.selectbox(
+                "✏️ Trip:",
+                trip_options,
+                format_func=lambda i: "➕ Add a new trip" if i == NEW_TRIP else
+                f"Trip {i + 1}: {day_trips[i]['destination']} ({day_trips[i]['transport_type']})",
+                key=f"trip_pick_{day}",
+                on_change=pick_trip,
+                args=(day, day_trips)
+            )
+            # The fields are also written by the picker, autofill and suggestion callbacks, so they
+            # are seeded from the picked trip through session state rather than widget defaults
+            if any(f"{prefix}{day}" not in st.session_state for prefix in TRIP_FORM_KEYS):
+                fill_trip_form(day, day_trips[pick] if pick != NEW_TRIP else {})
+
+            destination = st.text_input(
+                "🎯 Where did you travel?",
+                key=f"dest_{day}",
+                on_change=autofill_distance,
+                args=(day,)
+            )
+            suggestions = [place for place in st.session_state.destinations.complete(destination) if place != destination]
+            if suggestions:
+                st.pills("Recent destinations", suggestions, key=f"dest_pick_{day}", label_visibility="collapsed",
+                         on_change=pick_destination, args=(day,))
+            city = st.session_state.user_data['city']
+            known_distance = load_gazetteer().distance_km(city, destination) if destination else None
+            if known_distance is not None:
+                st.caption(f"📍 {known_distance:.1f} km from {city} as the crow flies")
+            elif destination:
+                # An unknown name gets no distance; offer the known places closest to the user's city instead
+                nearby = load_gazetteer().near(city)
+                if nearby:
+                    st.caption(f"📍 {destination} isn't a known place. Known places near {city}:")
+                    st.pills("Known places nearby", [place for place, _ in nearby], key=f"near_pick_{day}",
+                             label_visibility="collapsed", on_change=pick_destination, args=(day, 'near_pick'))
+
+            # Transport type selection
+            transport_options = list(TRANSPORT_MODES)
+
+            transport_type = st.selectbox(
+                "🚀 Which transport did you use?",
+                transport_options,
+                key=f"transport_{day}"
+            )
+
+            distance = st.number_input(
+                "📏 Distance traveled (km):",
+                min_value=0.0,
+                step=0.5,
+                key=f"dist_{day}"
+            )
+
+            trip_type = st.radio(
+                "🔄 Trip Type:",
+                ["One-way", "Round-trip"],
+                key=f"trip_{day}"
+            )
+
+            # Calculate actual distance based on trip type
+            actual_distance = distance * (2 if trip_type == "Round-trip" else 1)
+
+            if distance > 0:
+                try:
+                    cost, emission = calculate_emissions_and_cost(actual_distance, transport_type, day_date)
+                    # Show live calculation
+                    st.info(f"💡 **Live Calculation:** {actual_distance}km × {transport_type} = ₹{cost:.2f} cost, {emission:.0f}g CO₂")
+                except Exception as e:
+                    st.error(f"Error in calculation: {str(e)}")
+                    cost, emission = 0.0, 0.0
+
+            if st.session_state.get('saved_day') == day:
+                del st.session_state.saved_day
+                st.success(f"✅ {day} data saved successfully!")
+
+            save_label = f"💾 Add {day} Trip" if pick == NEW_TRIP else f"💾 Save {day} Trip {pick + 1}"
+            if st.button(save_label, key=f"save_{day}"):
+                if destination and distance > 0:
+                    try:
+                        cost, emission = calculate_emissions_and_cost(actual_distance, transport_type, day_date)
+
+                        day_record = {
+                            'traveled': True,
+                            'destination': destination,
+                            'transport_type': transport_type,
+                            'distance': distance,
+                            'actual_distance': actual_distance,
+                            'trip_type': trip_type,
+                            'cost': cost,
+                            'emission': emission
+                        }
+                        name = st.session_state.user_data['name']
+                        if pick == NEW_TRIP:
+                            # A new trip joins the day's others; nothing already saved is touched
+                            trip_store.add_trip(name, day_date, day_record)
+                            get_leaderboard().apply(name, added=[day_record])
+                            st.session_state.week_trips.append(dict(day_record, trip_date=day_date))
+                            st.session_state.weekly_aggregate.add(day, day_record)
+                            st.session_state[f"next_trip_pick_{day}"] = len(day_trips)
+                        else:
+                            # Only the picked trip is overwritten
+                            replaced = day_trips[pick]
+                            trip_store.replace_trip(name, day_date, pick, day_record)
+                            get_leaderboard().apply(name, added=[day_record], removed=[replaced])
+                            st.session_state.rollups.remove(dict(replaced, trip_date=day_date))
+                            st.session_state.destinations.remove(replaced['destination'], day_date)
+                            st.session_state.week_trips.replace_trip(day_date, pick, day_record)
+                            st.session_state.weekly_aggregate.replace(day, pick, day_record)
+                        st.session_state.rollups.add(dict(day_record, trip_date=day_date))
+                        st.session_state.destinations.add(destination, day_date)
+                        st.session_state.saved_day = day
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error saving data: {str(e)}")
+                else:
+                    st.error("Please enter destination and distance!")
+        elif day_data:
+            # Saved trips are only removed on an explicit click, never by rendering the "No" answer
+            st.warning(f"{len(day_trips)} saved trip(s) on {day}. Delete them to record that you didn't travel.")
+            if st.button(f"🗑️ Delete {day} Trips", key=f"delete_{day}"):
+                for trip in day_trips:
+                    st.session_state.rollups.remove(dict(trip, trip_date=day_date))
+                    st.session_state.destinations.remove(trip['destination'], day_date)
+                st.session_state.week_trips.delete_day(day_date)
+                trip_store.delete_day(st.session_state.user_data['name'], day_date)
+                get_leaderboard().apply(st.session_state.user_data['name'], removed=day_trips)
+                st.session_state.weekly_aggregate.delete(day)
+                st.rerun()
+        else:
+            st.markdown("""
+            <div class="no-travel-card">
+                <h4>🌱 Great Choice!</h4>
+                <p>You preserved money and reduced carbon emissions!</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+    with col2:
+        if len(day_trips) > 1:
+            st.caption(f"{len(day_trips)} trips on {day}; pick one above to edit it, or add another.")
+        for trip_number, data in enumerate(day_trips, start=1):
+            # Ensure all required fields exist with defaults
+            transport_type = data.get('transport_type', '🏍️ Motorcycle/Scooter')
+            trip_type = data.get('trip_type', 'One-way')
+            actual_distance = data.get('actual_distance', data.get('distance', 0))
+            title = f"{day} Summary" if len(day_trips) == 1 else f"{day} Trip {trip_number}"
+
+            st.markdown(f"""
+            <div class="day-card">
+                <h4>📊 {title}</h4>
+                <p><strong>🎯 Destination:</strong> {data['destination']}</p>
+                <p><strong>🚀 Transport:</strong> {transport_type}</p>
+                <p><strong>📏 Distance:</strong> {data['distance']} km ({trip_type})</p>
+                <p><strong>📍 Total Distance:</strong> {actual_distance} km</p>
+                <p><strong>💰 Cost:</strong> ₹{data['cost']:.2f}</p>
+                <p><strong>🌫️ CO₂:</strong> {data['emission']:.0f}g</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+
+@st.fragment(run_every=ANALYTICS_POLL)
+def render_pending(job, message):
+    """Placeholder for analytics still being computed; reruns the app once its job has finished"""
+    if job.done():
+        st.rerun()
+    st.info(message)
+
+
+def await_analytics(section, version, build, *args, message="⏳ Crunching your analytics..."):
+    """Result of build(job, *args) for a snapshot version, computed in the analytics pool.
+
+    Waits up to ANALYTICS_WAIT for it, then renders a placeholder and
+    returns None. A job still running for an older version of the same
+    section is cancelled.
+    """
+    job = get_analytics_pool().submit((st.session_state.analytics_owner, section), version, build, *args)
+    result = job.result(ANALYTICS_WAIT)
+    if result is None:
+        render_pending(job, message)
+    return result
+
+
+def build_summary_charts(job, aggregate, figures):
+    """Summary table and figures for a snapshot of the week's aggregate; runs in the analytics pool"""
+    from ecoride.charts import daily_figure, data_key, mode_share_figure
+    from ecoride.summary import transport_table
+
+    with profiler.section('aggregation'):
+        transport_df = transport_table(aggregate)
+        chart_data = aggregate.daily_rows(DAYS_OF_WEEK)
+
+    bar_fig = pie_fig = None
+    if chart_data:
+        job.check()
+        with profiler.section('chart_build'):
+            bar_fig = figures.get_or_build(data_key('daily', chart_data), lambda: daily_figure(chart_data))
+
+            # Transport mode distribution
+            job.check()
+            modes, distances = transport_df['Transport Mode'].tolist(), transport_df['distance'].tolist()
+            pie_fig = figures.get_or_build(data_key('modes', modes, distances),
+                                           lambda: mode_share_figure(modes, distances))
+    return transport_df, bar_fig, pie_fig
+
+
+def get_summary_charts(aggregate):
+    """Summary table and figures, reused until the aggregate changes; None while they are being built"""
+    cached = st.session_state.get('summary_charts')
+    if cached is not None and cached[0] == aggregate.version:
+        return cached[1]
+
+    # The job gets its own copy, so saves made while it runs cannot change its snapshot
+    charts = await_analytics('summary', aggregate.version, build_summary_charts,
+                             copy.deepcopy(aggregate), get_figure_cache(),
+                             message="⏳ Building your charts and transport analysis...")
+    if charts is not None:
+        st.session_state.summary_charts = (aggregate.version, charts)
+    return charts
+
+
+def render_summary_charts(transport_df, bar_fig, pie_fig):
+    """Daily and mode-share charts, the transport mode table and the best performers"""
+    # Charts
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Daily distance chart
+        if bar_fig is not None:
+            with profiler.section('chart_render'):
+                st.plotly_chart(bar_fig, use_container_width=True)
+
+    with col2:
+        if pie_fig is not None:
+            with profiler.section('chart_render'):
+                st.plotly_chart(pie_fig, use_container_width=True)
+
+    # Transport comparison section
+    st.subheader("🚀 Transport Mode Analysis")
+    if len(transport_df):
+        # Display transport comparison table
+        with profiler.section('table_styling'):
+            from ecoride.summary import style_transport_table
+
+            st.dataframe(style_transport_table(transport_df), use_container_width=True)
+
+        # Best and worst performers
+        if len(transport_df) > 1:
+            col1, col2 = st.columns(2)
+            with col1:
+                eco_friendly = transport_df.loc[transport_df['emission'].idxmin()]
+                st.success(f"🌱 **Most Eco-Friendly:** {eco_friendly['Transport Mode']} ({eco_friendly['emission']:.0f}g CO₂)")
+
+            with col2:
+                cost_effective = transport_df.loc[transport_df['cost'].idxmin()]
+                st.info(f"💰 **Most Cost-Effective:** {cost_effective['Transport Mode']} (₹{cost_effective['cost']:.2f})")
+
+
+@st.fragment
+def render_weekly_summary():
+    """Render the weekly summary and analytics section"""
+    st.markdown("---")
+    st.header("📈 Weekly Summary & Analytics")
+
+    # Totals and per-mode sums are maintained incrementally on save/delete
+    aggregate = st.session_state.weekly_aggregate
+    total_distance = aggregate.total_distance
+    total_cost = aggregate.total_cost
+    total_emission = aggregate.total_emission
+    travel_days = aggregate.travel_days
+
+    # Metrics row
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>📏 Total Distance</h3>
+            <h2>{total_distance:.1f} km</h2>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>💰 Total Cost</h3>
+            <h2>₹{total_cost:.2f}</h2>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col3:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>🌫️ CO₂ Emission</h3>
+            <h2>{total_emission/1000:.2f} kg</h2>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col4:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3>🗓️ Travel Days</h3>
+            <h2>{travel_days}/7</h2>
+        </div>
+        """, unsafe_allow_html=True)
+
+    # Charts and the transport table are built in the background; totals above are already incremental
+    charts = get_summary_charts(aggregate)
+    if charts is not None:
+        render_summary_charts(*charts)
+
+    # Environmental impact section
+    st.subheader("🌍 Environmental Impact")
+
+    trees_equivalent = total_emission / 22000  # Rough estimate: 1 tree absorbs ~22kg CO2/year
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("🌳 Trees needed to offset", f"{trees_equivalent:.2f}", help="Trees needed to absorb the CO₂ you generated")
+    with col2:
+        car_equivalent = total_emission / 120  # Average car emits ~120g CO2/km
+        st.metric("🚗 Equivalent car km", f"{car_equivalent:.1f}", help="Equivalent distance if driven by car")
+    with col3:
+        saved_emission = (7 - travel_days) * 10 * 125  # Assuming 10km average if traveled every non-travel day
+        st.metric("💚 CO₂ Saved (g)", f"{saved_emission:.0f}", help="CO₂ saved by not traveling on rest days")
+
+    # Data export
+    st.subheader("📤 Export Data")
+    if st.button("📊 Download Weekly Report"):
+        from ecoride.reports import build_report, report_filename
+
+        report_data = build_report(st.session_state.user_data, st.session_state.week_trips.to_weekly_data(), aggregate)
+
+        st.download_button(
+            label="📁 Download JSON Report",
+            data=json.dumps(report_data, indent=2),
+            file_name=report_filename(st.session_state.user_data['name']),
+            mime="application/json"
+        )
+
+    render_history_export()
+
+
+def render_history_export():
+    """Full-history download, streamed from the trip store only when the button is clicked"""
+    from ecoride.exports import COMPRESSIONS, FORMATS, export_filename, export_mime, export_trips
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fmt = st.selectbox("🗂️ Full history format:", list(FORMATS), format_func=str.upper, key="export_format")
+    with col2:
+        compression = st.selectbox("🗜️ Compression:", COMPRESSIONS, index=1, format_func=str.title,
+                                   key="export_compression")
+    name = st.session_state.user_data['name']
+
+    # Streamlit holds a download in server memory as one bytes object, so long histories go through the CLI
+    row = get_leaderboard().user_row(name)
+    trips = row[4] if row is not None else sum(total[5] for total in trip_store.user_totals(name))
+    if trips > MAX_DOWNLOAD_TRIPS:
+        st.info(f"Your history has {trips:,} trips, too many to download from the app. Export it with "
+                f"`python -m ecoride.exports \"{name}\" OUTPUT --format {fmt} --compression {compression}`, "
+                "which streams it to a file without loading it into memory.")
+        return
+
+    def write_export():
+        # Runs on click in a separate thread; the file is unlinked once open, so nothing is left on disk
+        with tempfile.NamedTemporaryFile(suffix=export_filename('', fmt, compression)) as spool:
+            export_trips(trip_store, name, spool, fmt, compression)
+            spool.flush()
+            # download_button only accepts read-only file objects, not the temp file's read/write buffer
+            return open(spool.name, 'rb')
+
+    st.caption("The download is prepared in server memory; "
+               "`python -m ecoride.exports` streams it to a file instead.")
+    st.download_button(
+        label="📁 Download Full Trip History",
+        data=write_export,
+        file_name=export_filename(name, fmt, compression),
+        mime=export_mime(fmt, compression),
+    )
+
+
+@st.fragment
+def render_trends():
+    """Day to year views over the whole history, answered from the rollup index"""
+    from ecoride.charts import auto_granularity, data_key, series_arrays
+    from ecoride.rollups import GRANULARITIES
+
+    rollups = st.session_state.rollups
+    st.markdown("---")
+    st.header("📆 Long-Range Trends")
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        date_range = st.date_input(
+            "🗓️ Date range:",
+            value=(max(rollups.first_day, rollups.last_day - timedelta(days=365)), rollups.last_day),
+            key="trend_range"
+        )
+    with col2:
+        granularity = st.selectbox("📊 Group by:", ('auto',) + GRANULARITIES, format_func=str.title, key="trend_granularity")
+    if len(date_range) != 2:
+        return
+    start, end = date_range
+    if granularity == 'auto':
+        # Coarsen with the zoom range so the chart stays within a bounded number of bars
+        granularity = auto_granularity(start, end)
+
+    totals = rollups.totals(start, end)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("📏 Distance", f"{totals['total_distance']:.1f} km")
+    col2.metric("💰 Cost", f"₹{totals['total_cost']:.2f}")
+    col3.metric("🌫️ CO₂", f"{totals['total_emission']/1000:.2f} kg")
+    col4.metric("🗓️ Travel Days", totals['travel_days'])
+
+    periods, values = series_arrays(rollups.series(start, end, granularity))
+    if totals['travel_days']:
+        # The hash of the charted series is the snapshot: a new range or granularity supersedes the old job
+        key = data_key('trend', periods.astype('int64'), values, granularity)
+        fig = await_analytics('trend', key, build_trend_figure, get_figure_cache(), key, periods, values,
+                              granularity, message="⏳ Drawing your trend chart...")
+        if fig is not None:
+            st.plotly_chart(fig, use_container_width=True)
+
+    render_scenarios()
+
+
+def build_trend_figure(job, figures, key, periods, values, granularity):
+    """Trend chart for a series computed from the rollups; runs in the analytics pool"""
+    from ecoride.charts import trend_figure
+
+    with profiler.section('chart_build'):
+        return figures.get_or_build(key, lambda: trend_figure(periods, values, granularity))
+
+
+def build_scenario_report(job, name):
+    """Re-price a user's whole history under every mode; runs in the analytics pool"""
+    from ecoride.scenarios import report_from_rows
+
+    with profiler.section('scenarios'):
+        rows = []
+        for chunk in trip_store.trip_cost_chunks(name):
+            job.check()
+            rows.extend(chunk)
+        job.check()
+        return report_from_rows(rows)
+
+
+def get_scenario_report():
+    """Scenario report for the whole history, reused until a trip changes; None while it is being built"""
+    version = st.session_state.weekly_aggregate.version
+    cached = st.session_state.get('scenario_report')
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    report = await_analytics('scenarios', version, build_scenario_report, st.session_state.user_data['name'],
+                             message="⏳ Re-pricing your trip history...")
+    if report is not None:
+        st.session_state.scenario_report = (version, report)
+    return report
+
+
+def render_scenarios():
+    """What-if hints and a per-mode table for the whole trip history"""
+    import pandas as pd
+
+    with st.expander("🔮 What-if Scenarios"):
+        report = get_scenario_report()
+        if report is None:
+            return
+        for band in ('under 5 km', '5-20 km', 'over 20 km'):
+            switch = report.best_switch(band)
+            if switch is not None:
+                st.success(f"🌱 Switching all {switch.trips} trips {band} to **{switch.mode}** would save "
+                           f"₹{switch.cost_saving:.2f} and {switch.emission_saving/1000:.2f} kg CO₂")
+
+        st.caption("Your whole history re-priced as if every trip had used each mode "
+                   "(savings are against what you actually spent and emitted).")
+        st.dataframe(
+            pd.DataFrame(report.mode_rows()).style.format({
+                'cost': '₹{:.2f}',
+                'emission': '{:.0f}g',
+                'cost_saving': '₹{:.2f}',
+                'emission_saving': '{:.0f}g'
+            }),
+            hide_index=True,
+            use_container_width=True
+        )
+
+
+def render_week_grid():
+    """Edit a batch of trips in one grid and commit it with a single save"""
+    import pandas as pd
+    from ecoride.gazetteer import load_gazetteer
+    from ecoride.importer import prepare_chunk
+
+    with st.expander("🗓️ Bulk Trip Entry"):
+        st.caption("One row per trip; a day can have several trips and rows may fall outside this week. "
+                   "Blank distances to known places are filled in from your city. "
+                   "Saving replaces this week's trips with the grid's rows.")
+        if st.session_state.pop('saved_grid', None) is not None:
+            st.success("✅ All trips saved successfully!")
+
+        # The week the grid's rows were loaded from; saving replaces exactly that range
+        grid_week = st.session_state.loaded_week
+        grid = pd.DataFrame(st.session_state.week_trips.to_records(),
+                            columns=['trip_date', 'destination', 'transport_type', 'distance', 'trip_type'])
+        grid['trip_date'] = pd.to_datetime(grid['trip_date']).dt.date
+
+        # A form keeps cell edits client-side until the batch is submitted
+        with st.form("week_grid_form"):
+            edited = st.data_editor(
+                grid,
+                num_rows="dynamic",
+                # Keyed by the aggregate version so a fresh grid appears after every save
+                key=f"week_grid_{st.session_state.weekly_aggregate.version}",
+                use_container_width=True,
+                column_config={
+                    'trip_date': st.column_config.DateColumn("📅 Date", required=True, default=grid_week),
+                    'destination': st.column_config.TextColumn("🎯 Destination", required=True),
+                    'transport_type': st.column_config.SelectboxColumn(
+                        "🚀 Transport", options=list(TRANSPORT_MODES), required=True, default=TRANSPORT_MODES[0]),
+                    'distance': st.column_config.NumberColumn("📏 Distance (km)", min_value=0.0, step=0.5, required=True),
+                    'trip_type': st.column_config.SelectboxColumn(
+                        "🔄 Trip Type", options=["One-way", "Round-trip"], required=True, default="One-way"),
+                },
+            )
+            submitted = st.form_submit_button("💾 Save All Trips", type="primary")
+
+        if submitted:
+            edited = edited.dropna(how='all').reset_index(drop=True)
+            missing = ~(edited['distance'] > 0)
+            if missing.any():
+                km = load_gazetteer().distances_km(st.session_state.user_data['city'],
+                                                    edited.loc[missing, 'destination'].fillna('').astype(str).tolist())
+                edited.loc[missing, 'distance'] = pd.Series(km, index=edited.index[missing]).round(1)
+            incomplete = (edited['destination'].fillna('').astype(str).str.strip() == '') | ~(edited['distance'] > 0)
+            if incomplete.any():
+                rows = ', '.join(str(row + 1) for row in edited.index[incomplete])
+                st.error(f"Please enter destination and distance! (row {rows})")
+                return
+
+            # Validate and price the whole batch in one vectorized pass
+            priced, rejected = prepare_chunk(edited)
+            if rejected:
+                st.error(f"Error saving data: {rejected} row(s) have an invalid or far-future date, transport or trip type")
+                return
+
+            name = st.session_state.user_data['name']
+            trip_store.replace_range(name, grid_week, grid_week + timedelta(days=6), priced)
+            get_leaderboard().apply(name, added=priced.to_dict('records'), removed=st.session_state.week_trips.to_records())
+            load_trip_history(name)
+            st.session_state.saved_grid = len(priced)
+            st.rerun()
+
+
+def render_bulk_import():
+    """Stream an uploaded trip log into the trip store"""
+    from ecoride.importer import FORMATS, detect_format, import_trips
+
+    with st.expander("📥 Bulk Import Trips"):
+        st.caption("Upload a CSV, JSON Lines or Parquet export with trip_date, transport_type and distance "
+                   "columns (destination and trip_type are optional).")
+        uploaded = st.file_uploader("Trip log file", type=[suffix.lstrip('.') for suffix in FORMATS], key="import_file")
+        if uploaded is not None and st.button("📥 Import Trips", key="import_trips"):
+            progress_bar = st.progress(0.0, text="Importing trips...")
+            committed = {}
+
+            def report_progress(result, fraction):
+                committed['result'] = result
+                text = f"Imported {result.rows_imported:,} trips ({result.rows_per_second:,.0f} rows/s)"
+                progress_bar.progress(fraction if fraction is not None else 0.0, text=text)
+
+            try:
+                result = import_trips(trip_store, st.session_state.user_data['name'], uploaded,
+                                      detect_format(uploaded.name), progress=report_progress)
+            except (ValueError, ImportError) as e:
+                st.error(f"Error importing trips: {str(e)}")
+                return
+            finally:
+                # Chunks commit one at a time, so count whatever reached the store even if a later one failed
+                if 'result' in committed:
+                    partial = committed['result']
+                    get_leaderboard().add(st.session_state.user_data['name'], partial.distance, partial.cost,
+                                          partial.emission, partial.rows_imported)
+
+            progress_bar.progress(1.0, text="Import complete")
+            st.success(f"✅ Imported {result.rows_imported:,} trips in {result.seconds:.1f}s "
+                       f"({result.rows_per_second:,.0f} rows/s)")
+            if result.rows_rejected:
+                st.warning(f"⚠️ Skipped {result.rows_rejected:,} rows with an unknown transport type, "
+                           "invalid or far-future date or a negative or infinite distance")
+
+            # Imported trips may fall in the current week
+            load_trip_history(st.session_state.user_data['name'])
+
+
+@st.fragment
+def render_leaderboard():
+    """Team rankings by user and by city from the shared process-wide leaderboard"""
+    import pandas as pd
+    from ecoride.leaderboard import METRICS
+
+    board = get_leaderboard()
+    st.markdown("---")
+    st.header("🏆 Leaderboard")
+
+    labels = {'distance': "📏 Distance", 'cost': "💰 Cost", 'emission': "🌫️ CO₂", 'trips': "🧳 Trips"}
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        metric = st.radio("Rank by:", METRICS, format_func=labels.get, horizontal=True, key="leaderboard_metric")
+    with col2:
+        my_city = st.toggle(f"Only {st.session_state.user_data['city']}", key="leaderboard_my_city")
+
+    formats = {'Distance': '{:.1f} km', 'Cost': '₹{:.2f}', 'CO₂': '{:.0f}g'}
+    users_tab, cities_tab = st.tabs(["👥 Users", "🏙️ Cities"])
+    with users_tab:
+        rows = board.top_users(metric, city=st.session_state.user_data['city'] if my_city else None)
+        users_df = pd.DataFrame(rows, columns=['User', 'City', 'Distance', 'Cost', 'CO₂', 'Trips'])
+        users_df.index = range(1, len(users_df) + 1)
+        st.dataframe(users_df.style.format(formats), use_container_width=True)
+    with cities_tab:
+        cities_df = pd.DataFrame(board.top_cities(metric), columns=['City', 'Distance', 'Cost', 'CO₂', 'Trips'])
+        cities_df.index = range(1, len(cities_df) + 1)
+        st.dataframe(cities_df.style.format(formats), use_container_width=True)
+
+
 # Main content area
 if st.session_state.current_step == 'setup':
     col1, col2, col3 = st.columns([1, 2, 1])
@@ -201,301 +943,32 @@ else:
     # Weekly tracking interface
     st.header("📅 Weekly Travel Tracker")
     
-    days_of_week = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    days_of_week = DAYS_OF_WEEK
     
     # Create tabs for each day
     tabs = st.tabs([f"📅 {day}" for day in days_of_week])
     
-    for i, (tab, day) in enumerate(zip(tabs, days_of_week)):
-        with tab:
-            st.subheader(f"🌟 {day} Travel Log")
-            
-            col1, col2 = st.columns([2, 1])
-            
-            with col1:
-                traveled = st.radio(
-                    f"Did you travel on {day}?",
-                    ["No", "Yes"],
-                    key=f"travel_{day}",
-                    index=1 if day in st.session_state.user_data['weekly_data'] and st.session_state.user_data['weekly_data'][day]['traveled'] else 0
-                )
-                
-                if traveled == "Yes":
-                    destination = st.text_input(
-                        "🎯 Where did you travel?",
-                        key=f"dest_{day}",
-                        value=st.session_state.user_data['weekly_data'].get(day, {}).get('destination', '')
-                    )
-                    
-                    # Transport type selection
-                    transport_options = [
-                        "🏍️ Motorcycle/Scooter",
-                        "🚗 Car (Petrol)",
-                        "🚗 Car (Diesel)", 
-                        "🚌 Bus",
-                        "🚆 Train",
-                        "🚕 Auto Rickshaw",
-                        "🚲 Bicycle",
-                        "🚶 Walking",
-                        "✈️ Flight (Domestic)",
-                        "🛵 Electric Scooter"
-                    ]
-                    
-                    transport_type = st.selectbox(
-                        "🚀 Which transport did you use?",
-                        transport_options,
-                        key=f"transport_{day}",
-                        index=transport_options.index(st.session_state.user_data['weekly_data'].get(day, {}).get('transport_type', transport_options[0]))
-                    )
-                    
-                    distance = st.number_input(
-                        "📏 Distance traveled (km):",
-                        min_value=0.0,
-                        step=0.5,
-                        key=f"dist_{day}",
-                        value=float(st.session_state.user_data['weekly_data'].get(day, {}).get('distance', 0))
-                    )
-                    
-                    trip_type = st.radio(
-                        "🔄 Trip Type:",
-                        ["One-way", "Round-trip"],
-                        key=f"trip_{day}",
-                        index=0 if st.session_state.user_data['weekly_data'].get(day, {}).get('trip_type', 'One-way') == 'One-way' else 1
-                    )
-                    
-                    # Calculate actual distance based on trip type
-                    actual_distance = distance * (2 if trip_type == "Round-trip" else 1)
-                    
-                    if distance > 0:
-                        try:
-                            cost, emission = calculate_emissions_and_cost(actual_distance, transport_type)
-                            # Show live calculation
-                            st.info(f"💡 **Live Calculation:** {actual_distance}km × {transport_type} = ₹{cost:.2f} cost, {emission:.0f}g CO₂")
-                        except Exception as e:
-                            st.error(f"Error in calculation: {str(e)}")
-                            cost, emission = 0.0, 0.0
-                    
-                    if st.button(f"💾 Save {day} Data", key=f"save_{day}"):
-                        if destination and distance > 0:
-                            try:
-                                cost, emission = calculate_emissions_and_cost(actual_distance, transport_type)
-                                
-                                st.session_state.user_data['weekly_data'][day] = {
-                                    'traveled': True,
-                                    'destination': destination,
-                                    'transport_type': transport_type,
-                                    'distance': distance,
-                                    'actual_distance': actual_distance,
-                                    'trip_type': trip_type,
-                                    'cost': cost,
-                                    'emission': emission
-                                }
-                                st.success(f"✅ {day} data saved successfully!")
-                            except Exception as e:
-                                st.error(f"Error saving data: {str(e)}")
-                        else:
-                            st.error("Please enter destination and distance!")
-                else:
-                    if day in st.session_state.user_data['weekly_data']:
-                        del st.session_state.user_data['weekly_data'][day]
-                    st.markdown("""
-                    <div class="no-travel-card">
-                        <h4>🌱 Great Choice!</h4>
-                        <p>You preserved money and reduced carbon emissions!</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-            
-            with col2:
-                if day in st.session_state.user_data['weekly_data'] and st.session_state.user_data['weekly_data'][day]['traveled']:
-                    data = st.session_state.user_data['weekly_data'][day]
-                    # Ensure all required fields exist with defaults
-                    transport_type = data.get('transport_type', '🏍️ Motorcycle/Scooter')
-                    trip_type = data.get('trip_type', 'One-way')
-                    actual_distance = data.get('actual_distance', data.get('distance', 0))
-                    
-                    st.markdown(f"""
-                    <div class="day-card">
-                        <h4>📊 {day} Summary</h4>
-                        <p><strong>🎯 Destination:</strong> {data['destination']}</p>
-                        <p><strong>🚀 Transport:</strong> {transport_type}</p>
-                        <p><strong>📏 Distance:</strong> {data['distance']} km ({trip_type})</p>
-                        <p><strong>📍 Total Distance:</strong> {actual_distance} km</p>
-                        <p><strong>💰 Cost:</strong> ₹{data['cost']:.2f}</p>
-                        <p><strong>🌫️ CO₂:</strong> {data['emission']:.0f}g</p>
-                    </div>
-                    """, unsafe_allow_html=True)
+    with profiler.section('day_tabs'):
+        for i, (tab, day) in enumerate(zip(tabs, days_of_week)):
+            with tab:
+                render_day_tab(day, current_week + timedelta(days=i))
+
+    with profiler.section('week_grid'):
+        render_week_grid()
+    with profiler.section('bulk_import'):
+        render_bulk_import()
 
     # Weekly Summary Section
-    if st.session_state.user_data['weekly_data']:
-        st.markdown("---")
-        st.header("📈 Weekly Summary & Analytics")
-        
-        # Calculate totals with error handling
-        total_distance = 0
-        total_cost = 0
-        total_emission = 0
-        travel_days = 0
-        
-        for day_data in st.session_state.user_data['weekly_data'].values():
-            if day_data.get('traveled', False):
-                total_distance += day_data.get('actual_distance', day_data.get('distance', 0))
-                total_cost += day_data.get('cost', 0)
-                total_emission += day_data.get('emission', 0)
-                travel_days += 1
-        
-        # Transport mode analysis with error handling
-        transport_usage = {}
-        for day_data in st.session_state.user_data['weekly_data'].values():
-            if day_data.get('traveled', False):
-                transport = day_data.get('transport_type', '🏍️ Motorcycle/Scooter')
-                if transport not in transport_usage:
-                    transport_usage[transport] = {'distance': 0, 'cost': 0, 'emission': 0, 'trips': 0}
-                transport_usage[transport]['distance'] += day_data.get('actual_distance', day_data.get('distance', 0))
-                transport_usage[transport]['cost'] += day_data.get('cost', 0)
-                transport_usage[transport]['emission'] += day_data.get('emission', 0)
-                transport_usage[transport]['trips'] += 1
-        
-        # Metrics row
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>📏 Total Distance</h3>
-                <h2>{total_distance:.1f} km</h2>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>💰 Total Cost</h3>
-                <h2>₹{total_cost:.2f}</h2>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>🌫️ CO₂ Emission</h3>
-                <h2>{total_emission/1000:.2f} kg</h2>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col4:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>🗓️ Travel Days</h3>
-                <h2>{travel_days}/7</h2>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Charts
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Daily distance chart
-            chart_data = []
-            for day in days_of_week:
-                if day in st.session_state.user_data['weekly_data'] and st.session_state.user_data['weekly_data'][day]['traveled']:
-                    chart_data.append({
-                        'Day': day,
-                        'Distance': st.session_state.user_data['weekly_data'][day]['actual_distance'],
-                        'Cost': st.session_state.user_data['weekly_data'][day]['cost'],
-                        'Emission': st.session_state.user_data['weekly_data'][day]['emission'],
-                        'Transport': st.session_state.user_data['weekly_data'][day]['transport_type']
-                    })
-            
-            if chart_data:
-                df = pd.DataFrame(chart_data)
-                
-                fig = px.bar(df, x='Day', y='Distance', 
-                           title='📏 Daily Distance Traveled',
-                           color='Transport',
-                           hover_data=['Cost', 'Emission'])
-                fig.update_layout(showlegend=True)
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            if chart_data:
-                # Transport mode distribution
-                transport_df = pd.DataFrame.from_dict(transport_usage, orient='index')
-                transport_df.reset_index(inplace=True)
-                transport_df.rename(columns={'index': 'Transport'}, inplace=True)
-                
-                fig = px.pie(transport_df, values='distance', names='Transport',
-                           title='🚀 Distance by Transport Mode')
-                fig.update_traces(textposition='inside', textinfo='percent+label')
-                st.plotly_chart(fig, use_container_width=True)
-        
-        # Transport comparison section
-        st.subheader("🚀 Transport Mode Analysis")
-        if transport_usage:
-            transport_df = pd.DataFrame.from_dict(transport_usage, orient='index')
-            transport_df.reset_index(inplace=True)
-            transport_df.rename(columns={'index': 'Transport Mode'}, inplace=True)
-            
-            # Display transport comparison table
-            st.dataframe(
-                transport_df.style.format({
-                    'distance': '{:.1f} km',
-                    'cost': '₹{:.2f}',
-                    'emission': '{:.0f}g',
-                    'trips': '{:.0f}'
-                }),
-                use_container_width=True
-            )
-            
-            # Best and worst performers
-            if len(transport_df) > 1:
-                col1, col2 = st.columns(2)
-                with col1:
-                    eco_friendly = transport_df.loc[transport_df['emission'].idxmin()]
-                    st.success(f"🌱 **Most Eco-Friendly:** {eco_friendly['Transport Mode']} ({eco_friendly['emission']:.0f}g CO₂)")
-                
-                with col2:
-                    cost_effective = transport_df.loc[transport_df['cost'].idxmin()]
-                    st.info(f"💰 **Most Cost-Effective:** {cost_effective['Transport Mode']} (₹{cost_effective['cost']:.2f})")
-        
-        # Environmental impact section
-        st.subheader("🌍 Environmental Impact")
-        
-        trees_equivalent = total_emission / 22000  # Rough estimate: 1 tree absorbs ~22kg CO2/year
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("🌳 Trees needed to offset", f"{trees_equivalent:.2f}", help="Trees needed to absorb the CO₂ you generated")
-        with col2:
-            car_equivalent = total_emission / 120  # Average car emits ~120g CO2/km
-            st.metric("🚗 Equivalent car km", f"{car_equivalent:.1f}", help="Equivalent distance if driven by car")
-        with col3:
-            saved_emission = (7 - travel_days) * 10 * 125  # Assuming 10km average if traveled every non-travel day
-            st.metric("💚 CO₂ Saved (g)", f"{saved_emission:.0f}", help="CO₂ saved by not traveling on rest days")
-        
-        # Data export
-        st.subheader("📤 Export Data")
-        if st.button("📊 Download Weekly Report"):
-            report_data = {
-                'user_info': {
-                    'name': st.session_state.user_data['name'],
-                    'vehicle': st.session_state.user_data['vehicle'],
-                    'city': st.session_state.user_data['city']
-                },
-                'weekly_summary': {
-                    'total_distance_km': total_distance,
-                    'total_cost_rs': total_cost,
-                    'total_emission_g': total_emission,
-                    'travel_days': travel_days
-                },
-                'daily_data': st.session_state.user_data['weekly_data']
-            }
-            
-            st.download_button(
-                label="📁 Download JSON Report",
-                data=json.dumps(report_data, indent=2),
-                file_name=f"{st.session_state.user_data['name']}_travel_report.json",
-                mime="application/json"
-            )
+    if len(st.session_state.week_trips):
+        with profiler.section('summary'):
+            render_weekly_summary()
+
+    if len(st.session_state.get('rollups', ())):
+        with profiler.section('trends'):
+            render_trends()
+
+    with profiler.section('leaderboard'):
+        render_leaderboard()
 
 # Footer
 st.markdown("---")
@@ -504,4 +977,18 @@ st.markdown("""
     <p>🌱 Made with ❤️ to promote eco-friendly transportation choices</p>
     <p>💡 Tip: Consider using public transport or cycling to reduce your carbon footprint!</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# Profiling debug panel (only with ECORIDE_PROFILE=1)
+if profiler.enabled:
+    profiler.record('rerun', time.perf_counter() - rerun_started)
+    with st.sidebar.expander("🛠️ Rerun Profile"):
+        st.dataframe(
+            [dict(section=name, **entry) for name, entry in profiler.stats().items()],
+            hide_index=True,
+            use_container_width=True
+        )
+        st.download_button("📁 Profile JSON", profiler.to_json(), "profile.json", "application/json")
+        st.download_button("📁 Prometheus Metrics", profiler.to_prometheus(), "profile.prom", "text/plain")
+    if os.environ.get('ECORIDE_PROFILE_DIR'):
+        profiler.maybe_export(os.environ['ECORIDE_PROFILE_DIR'])